@@ -0,0 +1,190 @@
+"""
+Append-only activity log.
+
+Routes call record() for logins, progress changes, lesson completions and
+session transitions. Events are buffered in memory and a background writer
+appends them to activity_events in one transaction per batch, so recording
+an event never waits on the database. The writer flushes at least every
+flush_interval seconds, when max_batch events are waiting, and at exit; a
+crash therefore loses at most the last interval's events. If the database
+stays unavailable the buffer keeps the newest max_buffer events and counts
+the rest as dropped.
+
+Each event is written to the database that was current when it was
+recorded (see init_app's `target`), so one writer serves every shard.
+
+Downstream rollups read with consume(), which hands over the events after a
+named cursor and advances the cursor in the same transaction as whatever
+the handler writes, so each event is processed exactly once.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from models import ActivityEvent, fetch_all
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_BATCH = 500
+DEFAULT_MAX_BUFFER = 50000
+
+
+class EventLog:
+    """In-memory event buffer with a background batch writer"""
+
+    def __init__(self, db_path, flush_interval=DEFAULT_FLUSH_INTERVAL, max_batch=DEFAULT_MAX_BATCH,
+                 max_buffer=DEFAULT_MAX_BUFFER, target=None):
+        self.db_path = db_path
+        self.target = target
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        self.written = 0
+        self.dropped = 0
+        self._buffer = []
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._pid = None
+
+    def record(self, event_type, user_id=None, subject_id=None, **data):
+        """Queue one event; returns immediately"""
+        db_path = self.target() if self.target else self.db_path
+        event = (db_path, (event_type, user_id, subject_id, json.dumps(data, default=str) if data else None,
+                           datetime.now()))
+        with self._condition:
+            self._ensure_writer()
+            self._buffer.append(event)
+            if len(self._buffer) > self.max_buffer:
+                excess = len(self._buffer) - self.max_buffer
+                del self._buffer[:excess]
+                self.dropped += excess
+            if len(self._buffer) >= self.max_batch:
+                self._condition.notify()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of events written"""
+        with self._condition:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        by_database = {}
+        for db_path, event in batch:
+            by_database.setdefault(db_path, []).append(event)
+
+        failed = []
+        error = None
+        with self._write_lock:
+            for db_path, events in by_database.items():
+                try:
+                    self._write(db_path, events)
+                except sqlite3.Error as e:
+                    failed.extend((db_path, event) for event in events)
+                    error = e
+        if failed:
+            with self._condition:
+                # Put them back in front of anything recorded meanwhile
+                self._buffer[:0] = failed
+            raise error
+        return len(batch)
+
+    def _write(self, db_path, events):
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO activity_events (event_type, user_id, subject_id, data, occurred_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', events)
+        finally:
+            conn.close()
+        self.written += len(events)
+
+    def _ensure_writer(self):
+        # Threads do not survive fork: each worker process starts its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._writer = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+            self._writer.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._buffer) >= self.max_batch, self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing activity events: {e}")
+
+
+log = None
+
+
+def init_app(app, target=None):
+    """Create the process-wide event log for the app's database
+
+    `target` returns the database file events recorded right now belong to.
+    """
+    global log
+    log = EventLog(app.config['DATABASE'],
+                   app.config.get('ACTIVITY_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+                   app.config.get('ACTIVITY_MAX_BATCH', DEFAULT_MAX_BATCH),
+                   target=target)
+
+
+def record(event_type, user_id=None, subject_id=None, **data):
+    """Record an event on the app's log (a no-op outside the app)"""
+    if log is not None:
+        log.record(event_type, user_id, subject_id, **data)
+
+
+def flush():
+    """Write any buffered events now, e.g. before a worker exits"""
+    if log is not None:
+        try:
+            return log.flush()
+        except sqlite3.Error as e:
+            print(f"Error writing activity events: {e}")
+    return 0
+
+
+atexit.register(flush)
+
+
+def read_events(conn, after_id=0, limit=1000):
+    """Events with an id greater than `after_id`, oldest first"""
+    return fetch_all(conn, ActivityEvent, 'SELECT * FROM activity_events WHERE id > ? ORDER BY id LIMIT ?',
+                     (after_id, limit))
+
+
+def cursor_position(conn, consumer):
+    row = conn.execute('SELECT last_event_id FROM event_cursors WHERE consumer = ?', (consumer,)).fetchone()
+    return row[0] if row else 0
+
+
+def consume(conn, consumer, handler, limit=1000):
+    """Pass the next events after `consumer`'s cursor to handler(conn, events)
+
+    The handler's writes and the cursor update commit together; if the
+    handler raises, both roll back and the same events are delivered next
+    time. Returns the number of events handled.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        events = read_events(conn, cursor_position(conn, consumer), limit)
+        if events:
+            handler(conn, events)
+            conn.execute('''
+                INSERT INTO event_cursors (consumer, last_event_id, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(consumer) DO UPDATE SET last_event_id = excluded.last_event_id,
+                                                    updated_at = excluded.updated_at
+            ''', (consumer, events[-1].id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(events)
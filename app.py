@@ -1,27 +1,92 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response, \
+    has_request_context
+from flask.json.provider import DefaultJSONProvider
 import sqlite3
 from datetime import datetime
+import csv
+import io
 import os
 
+import activity
+import assets
+import availability
+import database
+import fragment_cache
+import recommendations
+import session_lifecycle
+import shards
+import snapshot
+from models import Model, User, Course, Lesson, Progress, TutoringSession, Availability, fetch_all, fetch_one
+
+
+class ModelJSONProvider(DefaultJSONProvider):
+    """Lets API endpoints jsonify row models directly"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Model):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
 app = Flask(__name__)
+app.json = ModelJSONProvider(app)
 app.secret_key = 'your-secret-key-change-in-production'
+app.config['DATABASE'] = database.DATABASE
+app.config['DIRECTORY_DATABASE'] = shards.DIRECTORY_DATABASE
+app.config['SHARDS_DIR'] = shards.SHARDS_DIR
+app.config['DRAIN_FILE'] = os.environ.get('LEARNING_HUB_DRAIN_FILE')
+app.config['SNAPSHOT_DATABASE'] = snapshot.SNAPSHOT_DATABASE
+app.config['SNAPSHOT_MAX_AGE'] = int(os.environ.get('LEARNING_HUB_SNAPSHOT_MAX_AGE', snapshot.DEFAULT_MAX_AGE))
+fragment_cache.init_app(app)
+assets.init_app(app)
+
+
+# Each organization's data lives in its own database file (shard); the
+# default organization is app.config['DATABASE']
+storage = shards.StorageRouter(app.config['DIRECTORY_DATABASE'], app.config['SHARDS_DIR'], app.config['DATABASE'])
+
+
+def current_organization():
+    if has_request_context():
+        return session.get('organization', shards.DEFAULT_ORGANIZATION)
+    return shards.DEFAULT_ORGANIZATION
+
+
+def current_database():
+    return storage.shard_path(current_organization())
+
+
+activity.init_app(app, target=current_database)
+recommendations.init_app(app, lambda: [storage.shard_path(slug) for slug in storage.organizations()])
 
 
 # Database helper function
-def get_db_connection():
-    conn = sqlite3.connect('learning_hub.db')
+def get_db_connection(organization=None):
+    conn = database.get_pool(storage.shard_path(organization or current_organization())).connect()
     conn.row_factory = sqlite3.Row
     return conn
 
 
-# Initialize database
+def report_snapshot_path():
+    if current_organization() == shards.DEFAULT_ORGANIZATION:
+        return app.config['SNAPSHOT_DATABASE']
+    return snapshot.snapshot_path(current_database())
+
+
+# Reports and exports read the periodically refreshed snapshot, never the live file
+def get_report_connection():
+    conn = snapshot.connect(current_database(), report_snapshot_path(), app.config['SNAPSHOT_MAX_AGE'])
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# Initialize database (applies only pending migrations, never sample data)
 def init_db():
-    with app.app_context():
-        db = get_db_connection()
-        with app.open_resource('schema.sql', mode='r') as f:
-            db.cursor().executescript(f.read())
-        db.commit()
-        db.close()
+    version = storage.setup()
+    # Score students queued while the app was down, or by migration 0008 for everyone
+    recommendations.refresher.refresh_all()
+    return version
 
 
 # Authentication decorator
@@ -51,6 +116,33 @@ def role_required(role):
     return decorator
 
 
+# Health checks for load balancers and process managers
+@app.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/readyz')
+def readyz():
+    # Touching the drain file takes this instance out of rotation before a restart
+    drain_file = app.config.get('DRAIN_FILE')
+    if drain_file and os.path.exists(drain_file):
+        return jsonify({'status': 'draining'}), 503
+
+    try:
+        conn = get_db_connection()
+        try:
+            ready = database.schema_is_current(conn, database.load_migrations())
+        finally:
+            conn.close()
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503
+
+    if not ready:
+        return jsonify({'status': 'migrations pending'}), 503
+    return jsonify({'status': 'ready'})
+
+
 # Routes
 @app.route('/')
 def index():
@@ -75,14 +167,18 @@ def login():
         email = request.form['email']
         password = request.form['password']
 
-        conn = get_db_connection()
-        user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
+        # The directory says which organization's shard holds this account
+        organization = storage.organization_for_email(email) or shards.DEFAULT_ORGANIZATION
+        conn = get_db_connection(organization)
+        user = fetch_one(conn, User, 'SELECT id, username, password, role FROM users WHERE email = ?', (email,))
         conn.close()
 
-        if user and user['password'] == password:
-            session['user_id'] = user['id']
-            session['user_role'] = user['role']
-            session['username'] = user['username']
+        if user and user.password == password:
+            session['organization'] = organization
+            session['user_id'] = user.id
+            session['user_role'] = user.role
+            session['username'] = user.username
+            activity.record('login', user.id)
             flash('Login successful!', 'success')
             return redirect(url_for('index'))
         else:
@@ -98,23 +194,52 @@ def register():
         email = request.form['email']
         password = request.form['password']
         role = request.form['role']
+        organization = request.form.get('organization', '').strip().lower() or shards.DEFAULT_ORGANIZATION
 
-        conn = get_db_connection()
         try:
-            conn.execute('''INSERT INTO users (username, email, password, role) 
+            conn = get_db_connection(organization)
+        except shards.ShardError as e:
+            flash(str(e), 'error')
+            return render_template('register.html')
+
+        # Emails are unique across all organizations, so claim it in the directory first
+        if not storage.claim_email(email, organization):
+            conn.close()
+            flash('Email already exists', 'error')
+            return render_template('register.html')
+
+        try:
+            cursor = conn.execute('''INSERT INTO users (username, email, password, role) 
                            VALUES (?, ?, ?, ?)''',
                          (username, email, password, role))
             conn.commit()
-            flash('Registration successful! Please login.', 'success')
-            return redirect(url_for('login'))
-        except sqlite3.IntegrityError:
-            flash('Email already exists', 'error')
+        except sqlite3.IntegrityError as e:
+            storage.release_email(email)
+            flash(registration_error(e), 'error')
+            return render_template('register.html')
+        except Exception:
+            # Never leave the email claimed by an account that does not exist
+            storage.release_email(email)
+            raise
         finally:
             conn.close()
 
+        storage.confirm_email(email, cursor.lastrowid)
+        flash('Registration successful! Please login.', 'success')
+        return redirect(url_for('login'))
+
     return render_template('register.html')
 
 
+def registration_error(error):
+    """Message for a users INSERT that broke a constraint"""
+    if 'users.username' in str(error):
+        return 'Username already exists'
+    if 'users.email' in str(error):
+        return 'Email already exists'
+    return 'Invalid registration details'
+
+
 @app.route('/logout')
 def logout():
     session.clear()
@@ -128,27 +253,31 @@ def logout():
 @role_required('student')
 def student_dashboard():
     conn = get_db_connection()
+    fragment_cache.use_data_version(conn, session['user_id'], current_organization())
 
     # Get enrolled courses with progress
-    courses = conn.execute('''
+    courses = fetch_all(conn, Course, '''
         SELECT c.*, p.progress 
         FROM courses c 
         JOIN progress p ON c.id = p.course_id 
         WHERE p.user_id = ?
-    ''', (session['user_id'],)).fetchall()
+    ''', (session['user_id'],))
 
     # Get recent sessions with tutor names and course titles
-    sessions = conn.execute('''
+    sessions = fetch_all(conn, TutoringSession, '''
         SELECT s.*, u.username as tutor_name, c.title as course_title
         FROM sessions s 
         JOIN users u ON s.tutor_id = u.id 
         LEFT JOIN courses c ON s.course_id = c.id
         WHERE s.student_id = ? 
         ORDER BY s.scheduled_date DESC LIMIT 5
-    ''', (session['user_id'],)).fetchall()
+    ''', (session['user_id'],))
+
+    # Precomputed from co-enrollment by recommendations.py
+    recommended = recommendations.recommended_courses(conn, session['user_id'])
 
     conn.close()
-    return render_template('student_dashboard.html', courses=courses, sessions=sessions)
+    return render_template('student_dashboard.html', courses=courses, sessions=sessions, recommended=recommended)
 
 
 # Tutor Dashboard
@@ -160,42 +289,33 @@ def tutor_dashboard():
 
     # Get current tutor ID
     current_tutor_id = session['user_id']
+    fragment_cache.use_data_version(conn, current_tutor_id, current_organization())
 
     # Get assigned students
-    students = conn.execute('''
+    students = fetch_all(conn, User, '''
         SELECT DISTINCT u.id, u.username, u.email 
         FROM users u 
         JOIN sessions s ON u.id = s.student_id 
         WHERE s.tutor_id = ?
-    ''', (current_tutor_id,)).fetchall()
-
-    # Get sessions and manually join the data
-    raw_sessions = conn.execute('''
-        SELECT * FROM sessions WHERE tutor_id = ? 
-        ORDER BY scheduled_date ASC, scheduled_time ASC
-    ''', (current_tutor_id,)).fetchall()
-
-    # Manually get student and course info for each session
-    sessions = []
-    for session_row in raw_sessions:
-        # Get student name
-        student = conn.execute('SELECT username FROM users WHERE id = ?', (session_row['student_id'],)).fetchone()
-        student_name = student['username'] if student else f"Student ID {session_row['student_id']}"
-
-        # Get course title
-        course_title = "General Tutoring"
-        if session_row['course_id']:
-            course = conn.execute('SELECT title FROM courses WHERE id = ?', (session_row['course_id'],)).fetchone()
-            course_title = course['title'] if course else f"Course ID {session_row['course_id']}"
-
-        # Create session dict with all info
-        session_dict = dict(session_row)
-        session_dict['student_name'] = student_name
-        session_dict['course_title'] = course_title
-        sessions.append(session_dict)
+    ''', (current_tutor_id,))
+
+    # Get sessions with student names and course titles in one query
+    sessions = fetch_all(conn, TutoringSession, '''
+        SELECT s.*,
+               COALESCE(u.username, 'Student ID ' || s.student_id) AS student_name,
+               CASE WHEN s.course_id IS NULL THEN 'General Tutoring'
+                    ELSE COALESCE(c.title, 'Course ID ' || s.course_id) END AS course_title
+        FROM sessions s
+        LEFT JOIN users u ON s.student_id = u.id
+        LEFT JOIN courses c ON s.course_id = c.id
+        WHERE s.tutor_id = ?
+        ORDER BY s.scheduled_date ASC, s.scheduled_time ASC
+    ''', (current_tutor_id,))
+
+    stats = session_lifecycle.tutor_stats(conn, current_tutor_id)
 
     conn.close()
-    return render_template('tutor_dashboard.html', students=students, sessions=sessions)
+    return render_template('tutor_dashboard.html', students=students, sessions=sessions, stats=stats)
 
 
 # Admin Dashboard
@@ -203,12 +323,14 @@ def tutor_dashboard():
 @login_required
 @role_required('admin')
 def admin_dashboard():
-    conn = get_db_connection()
+    conn = get_report_connection()
 
     # Get statistics
     total_users = conn.execute('SELECT COUNT(*) as count FROM users').fetchone()['count']
     total_courses = conn.execute('SELECT COUNT(*) as count FROM courses').fetchone()['count']
-    total_sessions = conn.execute('SELECT COUNT(*) as count FROM sessions').fetchone()['count']
+    total_sessions = conn.execute('''
+        SELECT (SELECT COUNT(*) FROM sessions) + (SELECT COUNT(*) FROM sessions_history) as count
+    ''').fetchone()['count']
 
     # Get recent registrations
     recent_users = conn.execute('''
@@ -222,7 +344,34 @@ def admin_dashboard():
                            total_users=total_users,
                            total_courses=total_courses,
                            total_sessions=total_sessions,
-                           recent_users=recent_users)
+                           recent_users=recent_users,
+                           snapshot_taken_at=snapshot.taken_at(report_snapshot_path()))
+
+
+@app.route('/admin/reports/sessions.csv')
+@login_required
+@role_required('admin')
+def export_sessions():
+    conn = get_report_connection()
+    cursor = conn.execute('''
+        SELECT s.id, s.scheduled_date, s.scheduled_time, s.duration, s.status, s.rating,
+               st.username as student, tu.username as tutor, c.title as course, s.archived_at
+        FROM all_sessions s
+        JOIN users st ON s.student_id = st.id
+        JOIN users tu ON s.tutor_id = tu.id
+        LEFT JOIN courses c ON s.course_id = c.id
+        ORDER BY s.scheduled_date, s.scheduled_time
+    ''')
+    rows = cursor.fetchall()
+    conn.close()
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    # The header comes from the statement, so an empty export still names its columns
+    writer.writerow(column[0] for column in cursor.description)
+    writer.writerows(tuple(row) for row in rows)
+    return Response(output.getvalue(), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=sessions.csv'})
 
 
 # Parent Dashboard
@@ -252,7 +401,7 @@ def parent_dashboard():
 def content_dashboard():
     conn = get_db_connection()
 
-    courses = conn.execute('SELECT * FROM courses ORDER BY created_at DESC').fetchall()
+    courses = fetch_all(conn, Course, 'SELECT * FROM courses ORDER BY created_at DESC')
 
     conn.close()
     return render_template('content_dashboard.html', courses=courses)
@@ -294,6 +443,20 @@ def schedule_session():
             flash('Sorry, that tutor is not available at the selected time. Please choose a different time.', 'error')
             return redirect(url_for('schedule_session'))
 
+        # Check the tutor's weekly availability (served from memory)
+        try:
+            tutor_free = availability.is_available(conn, int(tutor_id), availability.day_of_week(selected_date),
+                                                   session_time, namespace=current_organization())
+        except (ValueError, availability.AvailabilityError):
+            conn.close()
+            flash('Invalid session time.', 'error')
+            return redirect(url_for('schedule_session'))
+
+        if not tutor_free:
+            conn.close()
+            flash("That time is outside the tutor's weekly availability. Please choose a different time.", 'error')
+            return redirect(url_for('schedule_session'))
+
         # Create the session
         try:
             conn.execute('''
@@ -313,20 +476,23 @@ def schedule_session():
         except Exception as e:
             flash('Error scheduling session. Please try again.', 'error')
 
-    # Get available tutors
-    tutors = conn.execute('''
-        SELECT id, username, email FROM users 
-        WHERE role = 'tutor' 
-        ORDER BY username
-    ''').fetchall()
+    # Get available tutors, best rated first (sorted per request: one row per tutor, tutors without
+    # sessions have no tutor_stats row yet)
+    tutors = fetch_all(conn, User, '''
+        SELECT u.id, u.username, u.email, ts.average_rating, ts.rating_count, ts.completed_sessions
+        FROM users u
+        LEFT JOIN tutor_stats ts ON ts.tutor_id = u.id
+        WHERE u.role = 'tutor' 
+        ORDER BY ts.average_rating IS NULL, ts.average_rating DESC, u.username
+    ''')
 
     # Get student's enrolled courses
-    courses = conn.execute('''
+    courses = fetch_all(conn, Course, '''
         SELECT c.* FROM courses c
         JOIN progress p ON c.id = p.course_id
         WHERE p.user_id = ?
         ORDER BY c.title
-    ''', (session['user_id'],)).fetchall()
+    ''', (session['user_id'],))
 
     conn.close()
     return render_template('schedule_session.html', tutors=tutors, courses=courses)
@@ -346,6 +512,11 @@ def quick_schedule():
     conn = get_db_connection()
 
     try:
+        day = availability.day_of_week(datetime.strptime(session_date, '%Y-%m-%d').date())
+        if not availability.is_available(conn, int(tutor_id), day, session_time, namespace=current_organization()):
+            conn.close()
+            return jsonify({'status': 'error', 'message': "That time is outside the tutor's availability"})
+
         conn.execute('''
             INSERT INTO sessions (student_id, tutor_id, course_id, scheduled_date, scheduled_time, status)
             VALUES (?, ?, ?, ?, ?, 'scheduled')
@@ -392,6 +563,8 @@ def start_lesson(lesson_id):
             VALUES (?, ?, 0, ?)
         ''', (session['user_id'], lesson['course_id'], datetime.now()))
         conn.commit()
+        # A new course changes what this student should see next
+        recommendations.refresh_if_queued(conn, session['user_id'])
 
     conn.close()
     return render_template('start_lesson.html', lesson=lesson)
@@ -429,15 +602,28 @@ def complete_lesson(lesson_id):
     progress_per_lesson = 100 / total_lessons if total_lessons > 0 else 100
     new_progress = min(100, (current_progress['progress'] if current_progress else 0) + progress_per_lesson)
 
-    # Update progress
+    # Update progress in place, keeping the row and its other columns
+    now = datetime.now()
     conn.execute('''
-        INSERT OR REPLACE INTO progress (user_id, course_id, progress, updated_at)
-        VALUES (?, ?, ?, ?)
-    ''', (session['user_id'], lesson['course_id'], int(new_progress), datetime.now()))
+        INSERT INTO progress (user_id, course_id, lesson_id, progress, completed, last_accessed, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, course_id) DO UPDATE SET
+            lesson_id = excluded.lesson_id,
+            progress = excluded.progress,
+            completed = excluded.completed,
+            last_accessed = excluded.last_accessed,
+            updated_at = excluded.updated_at
+    ''', (session['user_id'], lesson['course_id'], lesson_id, int(new_progress), new_progress >= 100, now, now))
 
     conn.commit()
+    recommendations.refresh_if_queued(conn, session['user_id'])
     conn.close()
 
+    activity.record('lesson_completed', session['user_id'], lesson_id, course_id=lesson['course_id'],
+                    progress=int(new_progress))
+    if new_progress >= 100:
+        activity.record('course_completed', session['user_id'], lesson['course_id'])
+
     # Show appropriate success message
     if new_progress >= 100:
         flash(f'🎉 Congratulations! You completed "{lesson["title"]}" and finished the entire course!', 'success')
@@ -453,16 +639,16 @@ def complete_lesson(lesson_id):
 def course_view(course_id):
     conn = get_db_connection()
 
-    course = conn.execute('SELECT * FROM courses WHERE id = ?', (course_id,)).fetchone()
-    lessons = conn.execute('SELECT * FROM lessons WHERE course_id = ? ORDER BY lesson_order',
-                           (course_id,)).fetchall()
+    course = fetch_one(conn, Course, 'SELECT * FROM courses WHERE id = ?', (course_id,))
+    lessons = fetch_all(conn, Lesson, 'SELECT * FROM lessons WHERE course_id = ? ORDER BY lesson_order',
+                        (course_id,))
 
     # Get user progress if student
     progress = None
     completed_lessons = []
     if session['user_role'] == 'student':
-        progress = conn.execute('SELECT * FROM progress WHERE user_id = ? AND course_id = ?',
-                                (session['user_id'], course_id)).fetchone()
+        progress = fetch_one(conn, Progress, 'SELECT * FROM progress WHERE user_id = ? AND course_id = ?',
+                             (session['user_id'], course_id))
 
         # For demo purposes, we'll track completed lessons in session
         # In a real app, you'd have a separate table for lesson completions
@@ -481,11 +667,11 @@ def tutor_availability():
     conn = get_db_connection()
 
     # Get current availability
-    availability = conn.execute('''
+    availability = fetch_all(conn, Availability, '''
         SELECT * FROM tutor_availability 
         WHERE tutor_id = ? 
         ORDER BY day_of_week, start_time
-    ''', (session['user_id'],)).fetchall()
+    ''', (session['user_id'],))
 
     conn.close()
 
@@ -494,22 +680,66 @@ def tutor_availability():
     return render_template('tutor_availability.html', availability=availability, days=days)
 
 
+# Availability API
+@app.route('/api/update_availability', methods=['POST'])
+@login_required
+@role_required('tutor')
+def update_availability():
+    # A whole week from the editor replaces the stored week; a single slot
+    # from the availability modal is merged into it
+    try:
+        windows, replace = availability.parse_update(request.get_json(silent=True))
+    except availability.AvailabilityError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    conn = get_db_connection()
+    try:
+        inserted, deleted = availability.save_week(conn, session['user_id'], windows, replace=replace)
+        week = availability.get_week(conn, session['user_id'], current_organization())
+    finally:
+        conn.close()
+
+    return jsonify({
+        'status': 'success',
+        'inserted': inserted,
+        'deleted': deleted,
+        'availability': availability.week_to_json(week)
+    })
+
+
+@app.route('/api/tutors/<int:tutor_id>/availability')
+@login_required
+def tutor_availability_api(tutor_id):
+    conn = get_db_connection()
+    week = availability.get_week(conn, tutor_id, current_organization())
+    conn.close()
+    return jsonify({'tutor_id': tutor_id, 'availability': availability.week_to_json(week)})
+
+
 # API endpoints for AJAX
 @app.route('/api/update_progress', methods=['POST'])
 @login_required
 def update_progress():
     data = request.get_json()
     course_id = data['course_id']
-    progress = data['progress']
+    progress = int(data['progress'])
 
     conn = get_db_connection()
     conn.execute('''
-        INSERT OR REPLACE INTO progress (user_id, course_id, progress, updated_at)
-        VALUES (?, ?, ?, ?)
-    ''', (session['user_id'], course_id, progress, datetime.now()))
+        INSERT INTO progress (user_id, course_id, progress, completed, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, course_id) DO UPDATE SET
+            progress = excluded.progress,
+            completed = excluded.completed,
+            updated_at = excluded.updated_at
+    ''', (session['user_id'], course_id, progress, progress >= 100, datetime.now()))
     conn.commit()
+    # Progress on a new course enrolls the student in it
+    recommendations.refresh_if_queued(conn, session['user_id'])
     conn.close()
 
+    activity.record('progress_updated', session['user_id'], course_id, progress=progress)
+
     return jsonify({'status': 'success'})
 
 
@@ -521,61 +751,42 @@ def student_progress(student_id):
     conn = get_db_connection()
 
     # Get student info
-    student = conn.execute('SELECT * FROM users WHERE id = ? AND role = "student"',
-                           (student_id,)).fetchone()
+    student = fetch_one(conn, User, "SELECT id, username, email FROM users WHERE id = ? AND role = 'student'",
+                        (student_id,))
 
     if not student:
         conn.close()
         return jsonify({'error': 'Student not found'}), 404
 
     # Get student's course progress
-    progress_data = conn.execute('''
+    progress_data = fetch_all(conn, Progress, '''
         SELECT c.title, c.description, p.progress, p.updated_at
         FROM courses c
         JOIN progress p ON c.id = p.course_id
         WHERE p.user_id = ?
         ORDER BY p.updated_at DESC
-    ''', (student_id,)).fetchall()
+    ''', (student_id,))
 
     conn.close()
 
-    # Convert to list of dictionaries for JSON response
-    progress_list = []
-    for row in progress_data:
-        progress_list.append({
-            'title': row['title'],
-            'description': row['description'],
-            'progress': row['progress'],
-            'updated_at': row['updated_at']
-        })
-
-    return jsonify({
-        'student': {
-            'id': student['id'],
-            'username': student['username'],
-            'email': student['email']
-        },
-        'progress': progress_list
-    })
+    return jsonify({'student': student, 'progress': progress_data})
 
 
 # API endpoints for session management
+# Status changes go through session_lifecycle, which only applies a
+# transition while the session is still in a state it may start from
 @app.route('/api/join_session/<int:session_id>', methods=['POST'])
 @login_required
 def join_session(session_id):
     conn = get_db_connection()
+    try:
+        session_lifecycle.transition(conn, session_id, 'join', session['user_id'])
+        flash('Successfully joined the session! Session is now in progress.', 'success')
+    except session_lifecycle.TransitionError as e:
+        flash(str(e), 'error')
+    finally:
+        conn.close()
 
-    # Update session status to 'in_progress'
-    conn.execute('''
-        UPDATE sessions 
-        SET status = 'in_progress'
-        WHERE id = ? AND student_id = ?
-    ''', (session_id, session['user_id']))
-
-    conn.commit()
-    conn.close()
-
-    flash('Successfully joined the session! Session is now in progress.', 'success')
     return redirect(url_for('student_dashboard'))
 
 
@@ -584,18 +795,14 @@ def join_session(session_id):
 @role_required('tutor')
 def start_session(session_id):
     conn = get_db_connection()
+    try:
+        session_lifecycle.transition(conn, session_id, 'start', session['user_id'])
+        flash('Session started successfully! You are now teaching.', 'success')
+    except session_lifecycle.TransitionError as e:
+        flash(str(e), 'error')
+    finally:
+        conn.close()
 
-    # Update session status to 'in_progress'
-    conn.execute('''
-        UPDATE sessions 
-        SET status = 'in_progress'
-        WHERE id = ? AND tutor_id = ?
-    ''', (session_id, session['user_id']))
-
-    conn.commit()
-    conn.close()
-
-    flash('Session started successfully! You are now teaching.', 'success')
     return redirect(url_for('tutor_dashboard'))
 
 
@@ -604,25 +811,17 @@ def start_session(session_id):
 @role_required('tutor')
 def end_session(session_id):
     notes = request.form.get('notes', '')
-    rating = request.form.get('rating', '')
 
     conn = get_db_connection()
+    try:
+        rating = session_lifecycle.parse_rating(request.form.get('rating', ''))
+        session_lifecycle.transition(conn, session_id, 'end', session['user_id'], notes=notes, rating=rating)
+        flash('Session completed successfully! Summary has been saved.', 'success')
+    except session_lifecycle.TransitionError as e:
+        flash(str(e), 'error')
+    finally:
+        conn.close()
 
-    # Update session status to 'completed'
-    final_notes = f"{notes}"
-    if rating:
-        final_notes += f" | Rating: {rating}"
-
-    conn.execute('''
-        UPDATE sessions 
-        SET status = 'completed', notes = ?
-        WHERE id = ? AND tutor_id = ?
-    ''', (final_notes, session_id, session['user_id']))
-
-    conn.commit()
-    conn.close()
-
-    flash('Session completed successfully! Summary has been saved.', 'success')
     return redirect(url_for('tutor_dashboard'))
 
 
@@ -630,24 +829,44 @@ def end_session(session_id):
 @login_required
 def cancel_session(session_id):
     conn = get_db_connection()
+    try:
+        session_lifecycle.transition(conn, session_id, 'cancel', session['user_id'])
+        flash('Session has been cancelled.', 'warning')
+    except session_lifecycle.TransitionError as e:
+        flash(str(e), 'error')
+    finally:
+        conn.close()
 
-    # Update session status to 'cancelled'
-    conn.execute('''
-        UPDATE sessions 
-        SET status = 'cancelled'
-        WHERE id = ? AND (student_id = ? OR tutor_id = ?)
-    ''', (session_id, session['user_id'], session['user_id']))
-
-    conn.commit()
-    conn.close()
-
-    flash('Session has been cancelled.', 'warning')
     if session['user_role'] == 'student':
         return redirect(url_for('student_dashboard'))
     else:
         return redirect(url_for('tutor_dashboard'))
 
 
+# Full session history: archived sessions live in sessions_history, so
+# this reads the all_sessions view rather than the hot sessions table
+@app.route('/api/session_history')
+@login_required
+def session_history():
+    if session['user_role'] not in ('student', 'tutor'):
+        return jsonify({'status': 'error', 'message': 'Only students and tutors have a session history'}), 403
+
+    column = 'student_id' if session['user_role'] == 'student' else 'tutor_id'
+    conn = get_db_connection()
+    sessions = fetch_all(conn, TutoringSession, f'''
+        SELECT s.*, st.username as student_name, tu.username as tutor_name, c.title as course_title
+        FROM all_sessions s
+        JOIN users st ON s.student_id = st.id
+        JOIN users tu ON s.tutor_id = tu.id
+        LEFT JOIN courses c ON s.course_id = c.id
+        WHERE s.{column} = ?
+        ORDER BY s.scheduled_date DESC, s.scheduled_time DESC
+    ''', (session['user_id'],))
+    conn.close()
+
+    return jsonify({'sessions': sessions})
+
+
 # Session management pages
 @app.route('/session/<int:session_id>/join')
 @login_required
@@ -722,32 +941,15 @@ def end_session_page(session_id):
 
 
 if __name__ == '__main__':
-    # Check if database exists, if not create it
-    if not os.path.exists('learning_hub.db'):
-        print("Creating new database...")
-        init_db()
-    else:
-        # Update existing database with correct passwords
-        print("Updating existing database...")
+    # Development server: a brand new database also gets the demo accounts
+    is_new_database = not os.path.exists(app.config['DATABASE'])
+    init_db()
+    if is_new_database:
+        print("Loading demo data into new database...")
+        database.seed_sample_data(app.config['DATABASE'])
+        storage.sync_directory()
         conn = get_db_connection()
-        try:
-            # Update all existing demo users with simple passwords
-            demo_users = [
-                ('password123', 'admin@learninghub.edu'),
-                ('password123', 'john.doe@student.edu'),
-                ('password123', 'jane.smith@tutor.edu'),
-                ('password123', 'parent@family.com'),
-                ('password123', 'content@learninghub.edu')
-            ]
-
-            for password, email in demo_users:
-                conn.execute('UPDATE users SET password = ? WHERE email = ?', (password, email))
-
-            conn.commit()
-            print("Demo user passwords updated to 'password123'")
-        except Exception as e:
-            print(f"Error updating passwords: {e}")
-        finally:
-            conn.close()
+        recommendations.refresh(conn)
+        conn.close()
 
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True, port=int(os.environ.get('PORT', 5000)))
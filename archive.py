@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Session Archiver for Learning Hub
+Moves completed and cancelled sessions older than a cutoff from the hot
+sessions table into sessions_history, a batch at a time, so dashboard and
+scheduling queries only ever touch the small set of active and recent
+sessions. History views query the all_sessions union view instead.
+
+    python archive.py                 # archive sessions older than 180 days, in every organization
+    python archive.py --days 90 --batch-size 1000
+    python archive.py --organization acme
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from shards import router
+
+SESSION_COLUMNS = ('id, student_id, tutor_id, course_id, scheduled_date, scheduled_time, duration, status, notes, '
+                   'created_at, updated_at, rating')
+FINISHED_STATUSES = ('completed', 'cancelled')
+DEFAULT_DAYS = 180
+DEFAULT_BATCH_SIZE = 500
+
+
+def archive_sessions(conn, cutoff, batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """Move finished sessions scheduled before `cutoff` into sessions_history
+
+    Each batch is its own short write transaction, so interactive writers
+    are never blocked for long; `pause` seconds are slept between batches.
+    Returns the number of sessions archived.
+    """
+    archived = 0
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            ids = [row[0] for row in conn.execute('''
+                SELECT id FROM sessions
+                WHERE status IN (?, ?) AND scheduled_date < ?
+                LIMIT ?
+            ''', FINISHED_STATUSES + (cutoff.isoformat(), batch_size))]
+            if ids:
+                placeholders = ', '.join('?' for _ in ids)
+                conn.execute(f'''
+                    INSERT INTO sessions_history ({SESSION_COLUMNS})
+                    SELECT {SESSION_COLUMNS} FROM sessions WHERE id IN ({placeholders})
+                ''', ids)
+                conn.execute(f'DELETE FROM sessions WHERE id IN ({placeholders})', ids)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+        if pause:
+            time.sleep(pause)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive finished tutoring sessions')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='archive sessions older than this')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=0.05, help='seconds to wait between batches')
+    parser.add_argument('--organization', help='only this organization (default: all of them)')
+    args = parser.parse_args()
+
+    cutoff = date.today() - timedelta(days=args.days)
+    for slug in [args.organization] if args.organization else router.organizations():
+        conn = sqlite3.connect(router.shard_path(slug), timeout=30)
+        try:
+            count = archive_sessions(conn, cutoff, args.batch_size, args.pause)
+        finally:
+            conn.close()
+        print(f"✅ Archived {count} sessions scheduled before {cutoff} in '{slug}'")
+
+
+if __name__ == "__main__":
+    main()
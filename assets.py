@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Static Asset Pipeline for Learning Hub
+Builds minified, content-hashed copies of static/css and static/js into
+static/dist, with gzip and brotli variants generated ahead of time, and a
+manifest that maps each source file to its hashed name.
+
+    python assets.py    # build static/dist and static/dist/manifest.json
+
+At runtime init_app() loads the manifest once, rewrites
+url_for('static', filename='css/style.css') to the hashed file and serves
+static/dist itself: the precompressed variant is picked from
+Accept-Encoding and sent with send_file (sendfile(2) through the server's
+wsgi.file_wrapper) with immutable, year-long cache headers. Without a
+manifest, for example in development, url_for keeps serving the sources.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import abort, request, send_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from database import BASE_DIR
+
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+SOURCE_DIRS = ['css', 'js']
+ONE_YEAR = 365 * 24 * 60 * 60
+
+# Characters after which a '/' starts a regular expression, not a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def minify_css(source):
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    source = source.replace(';}', '}')
+    return source.strip()
+
+
+def _string_end(source, i):
+    """Index just past the quoted string starting at source[i]"""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def _template_end(source, i):
+    """Index just past the template literal starting at source[i]
+
+    ${...} substitutions are followed to their closing brace, so a nested
+    template or a '`' inside a string in the substitution does not end the
+    literal early.
+    """
+    i += 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == '`':
+            return i + 1
+        elif source.startswith('${', i):
+            i = _substitution_end(source, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _substitution_end(source, i):
+    """Index just past the '}' closing a template substitution"""
+    depth = 1
+    while i < len(source):
+        char = source[i]
+        if char in '\'"':
+            i = _string_end(source, i)
+        elif char == '`':
+            i = _template_end(source, i)
+        else:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+    return i
+
+
+def minify_js(source):
+    """Strip comments, indentation and blank lines from a script
+
+    Only code is touched: string, template and regular expression literals
+    are copied through unchanged, so multi-line template literals keep
+    their exact value. Line breaks in code are kept so automatic semicolon
+    insertion behaves exactly as it does in the source.
+    """
+    source = source.replace('\r\n', '\n')
+    out = []
+    last = ''  # last non-whitespace character written
+    i = 0
+    length = len(source)
+    while i < length:
+        char = source[i]
+        if char in '\'"`':
+            end = _template_end(source, i) if char == '`' else _string_end(source, i)
+            out.append(source[i:end])
+            last = char
+            i = end
+        elif source.startswith('//', i):
+            while i < length and source[i] != '\n':
+                i += 1
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+        elif char == '/' and (last or '(') in _REGEX_PRECEDERS:
+            # Regular expression literal
+            end = i + 1
+            in_class = False
+            while end < length and (source[end] != '/' or in_class):
+                if source[end] == '\\':
+                    end += 1
+                elif source[end] == '[':
+                    in_class = True
+                elif source[end] == ']':
+                    in_class = False
+                end += 1
+            out.append(source[i:end + 1])
+            last = '/'
+            i = end + 1
+        elif char in ' \t\n':
+            # Code whitespace: drop it at line ends and line starts, keep one
+            # line break per non-empty line and one space elsewhere
+            end = i
+            while end < length and source[end] in ' \t\n':
+                end += 1
+            if '\n' in source[i:end]:
+                while out and out[-1] == ' ':
+                    out.pop()
+                if out and out[-1] != '\n':
+                    out.append('\n')
+            elif out and out[-1] != '\n':
+                out.append(' ')
+            i = end
+        else:
+            out.append(char)
+            last = char
+            i += 1
+
+    return ''.join(out).rstrip()
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """Minify, fingerprint and precompress every asset; return the manifest"""
+    if os.path.exists(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, source_dir)):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, static_dir).replace(os.sep, '/')
+                stem, ext = os.path.splitext(name)
+
+                with open(path, 'rb') as f:
+                    data = f.read()
+                if ext in MINIFIERS:
+                    data = MINIFIERS[ext](data.decode('utf-8')).encode('utf-8')
+
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                hashed = f'{stem}.{digest}{ext}'
+                target = os.path.join(dist_dir, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                with open(target, 'wb') as f:
+                    f.write(data)
+                with open(target + '.gz', 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(data, quality=11))
+
+                manifest[name] = 'dist/' + hashed
+
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return manifest
+
+
+def load_assets(dist_dir=DIST_DIR):
+    """Read the manifest and index every built file with its encodings"""
+    manifest_file = os.path.join(dist_dir, 'manifest.json')
+    if not os.path.exists(manifest_file):
+        return {}, {}
+    with open(manifest_file, 'r') as f:
+        manifest = json.load(f)
+
+    files = {}
+    for hashed in manifest.values():
+        path = os.path.join(dist_dir, hashed[len('dist/'):])
+        variants = [(encoding, path + suffix) for encoding, suffix in (('br', '.br'), ('gzip', '.gz'))
+                    if os.path.exists(path + suffix)]
+        files[hashed[len('dist/'):]] = {
+            'path': path,
+            'mimetype': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            'variants': variants,
+        }
+    return manifest, files
+
+
+def init_app(app, dist_dir=DIST_DIR):
+    """Resolve static URLs through the manifest and serve static/dist"""
+    manifest, files = load_assets(dist_dir)
+    app.config['ASSET_MANIFEST'] = manifest
+    if not manifest:
+        return
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    @app.route('/static/dist/<path:filename>')
+    def dist_asset(filename):
+        asset = files.get(filename)
+        if asset is None:
+            abort(404)
+
+        path, encoding = asset['path'], None
+        for candidate, variant_path in asset['variants']:
+            if candidate in request.accept_encodings:
+                path, encoding = variant_path, candidate
+                break
+
+        response = send_file(path, mimetype=asset['mimetype'], conditional=True, max_age=ONE_YEAR)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = f'public, max-age={ONE_YEAR}, immutable'
+        return response
+
+
+if __name__ == "__main__":
+    built = build()
+    for source, target in built.items():
+        print(f"✅ {source} -> static/{target}")
+    if brotli is None:
+        print("ℹ️  brotli is not installed, only gzip variants were generated")
@@ -2,10 +2,13 @@ from flask import session, flash, redirect, url_for
 from functools import wraps
 import sqlite3
 
+from shards import DEFAULT_ORGANIZATION, router
 
-def authenticate_user(email, password):
+
+def authenticate_user(email, password, organization=None):
     """Authenticate user credentials"""
-    conn = sqlite3.connect('learning_hub.db')
+    organization = organization or router.organization_for_email(email) or DEFAULT_ORGANIZATION
+    conn = sqlite3.connect(router.shard_path(organization))
     conn.row_factory = sqlite3.Row
 
     user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
@@ -16,23 +19,32 @@ def authenticate_user(email, password):
     return None
 
 
-def create_user(username, email, password, role):
+def create_user(username, email, password, role, organization=DEFAULT_ORGANIZATION):
     """Create a new user account"""
-    conn = sqlite3.connect('learning_hub.db')
+    conn = sqlite3.connect(router.shard_path(organization))
+    if not router.claim_email(email, organization):
+        conn.close()
+        return False
     try:
-        conn.execute('''INSERT INTO users (username, email, password, role) 
+        cursor = conn.execute('''INSERT INTO users (username, email, password, role) 
                        VALUES (?, ?, ?, ?)''',
                      (username, email, password, role))
         conn.commit()
-        return True
     except sqlite3.IntegrityError:
+        router.release_email(email)
         return False
+    except Exception:
+        router.release_email(email)
+        raise
     finally:
         conn.close()
+    router.confirm_email(email, cursor.lastrowid)
+    return True
 
 
-def login_user(user):
+def login_user(user, organization=DEFAULT_ORGANIZATION):
     """Log in a user by setting session variables"""
+    session['organization'] = organization
     session['user_id'] = user['id']
     session['user_role'] = user['role']
     session['username'] = user['username']
@@ -0,0 +1,199 @@
+"""
+Weekly tutor availability.
+
+A week is a list of windows (day_of_week, start_time, end_time,
+is_available) with 0 = Sunday, as stored in tutor_availability.
+save_week() merges overlapping and adjacent windows, diffs the result
+against the stored rows and applies only the inserts and deletes, in one
+transaction. Triggers bump availability_versions on every change, and
+get_week() keeps each tutor's windows in memory until that version moves;
+`namespace` keeps tutors with the same id in different shards apart.
+"""
+
+import re
+import threading
+
+DAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+_TIME = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)(?::\d\d)?$')
+
+
+class AvailabilityError(ValueError):
+    """Raised for a window that cannot be stored"""
+
+
+def to_minutes(value):
+    """'09:30' -> 570 ('24:00' is accepted as the end of the day)"""
+    if value in ('24:00', '24:00:00'):
+        return 24 * 60
+    match = _TIME.match(str(value or ''))
+    if not match:
+        raise AvailabilityError(f"Invalid time '{value}', expected HH:MM")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def to_time(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def parse_window(data):
+    """Validate one window from a request payload; returns (day, start, end, is_available)"""
+    if not isinstance(data, dict):
+        raise AvailabilityError('Each window must be an object with day, start_time and end_time')
+    try:
+        day = int(data.get('day', data.get('day_of_week')))
+    except (TypeError, ValueError):
+        raise AvailabilityError('Each window needs a day between 0 (Sunday) and 6') from None
+    if not 0 <= day <= 6:
+        raise AvailabilityError('Each window needs a day between 0 (Sunday) and 6')
+
+    start = to_minutes(data.get('start_time'))
+    end = to_minutes(data.get('end_time'))
+    if end <= start:
+        raise AvailabilityError(f"End time must be after start time on {DAYS[day]}")
+    return day, start, end, bool(data.get('is_available', True))
+
+
+def parse_update(data):
+    """Validate an availability update payload; returns (windows, replace)
+
+    The payload is either a whole week ({"windows": [...], "replace": true})
+    or a single window, which is merged into the stored week.
+    """
+    if not isinstance(data, dict):
+        raise AvailabilityError('Expected a JSON object')
+    if 'windows' not in data:
+        return [parse_window(data)], False
+
+    if not isinstance(data['windows'], list):
+        raise AvailabilityError("'windows' must be a list of windows")
+    replace = data.get('replace', True)
+    if not isinstance(replace, bool):
+        raise AvailabilityError("'replace' must be true or false")
+    return [parse_window(window) for window in data['windows']], replace
+
+
+def merge_windows(windows):
+    """Merge overlapping and adjacent windows of the same day and kind
+
+    Takes and returns (day, start_minutes, end_minutes, is_available)
+    tuples; the result is sorted and has no two windows that touch.
+    """
+    merged = []
+    for day, start, end, is_available in sorted(windows, key=lambda w: (w[0], w[3], w[1], w[2])):
+        if merged:
+            last_day, last_start, last_end, last_available = merged[-1]
+            if last_day == day and last_available == is_available and start <= last_end:
+                merged[-1] = (day, last_start, max(last_end, end), is_available)
+                continue
+        merged.append((day, start, end, is_available))
+    merged.sort()
+    return merged
+
+
+def _stored_windows(conn, tutor_id):
+    """Stored rows as {window: [row ids]}"""
+    stored = {}
+    rows = conn.execute('''
+        SELECT id, day_of_week, start_time, end_time, is_available
+        FROM tutor_availability WHERE tutor_id = ?
+    ''', (tutor_id,)).fetchall()
+    for row_id, day, start_time, end_time, is_available in rows:
+        window = (day, to_minutes(start_time), to_minutes(end_time), bool(is_available))
+        stored.setdefault(window, []).append(row_id)
+    return stored
+
+
+def save_week(conn, tutor_id, windows, replace=True):
+    """Store a tutor's week, touching only the rows that change
+
+    With replace=False the new windows are merged into the stored week
+    instead of replacing it. Returns (inserted, deleted) row counts.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        stored = _stored_windows(conn, tutor_id)
+        if not replace:
+            windows = list(windows) + list(stored)
+        desired = set(merge_windows(windows))
+
+        # Keep one row per window that is still wanted; everything else goes
+        to_delete = []
+        for window, row_ids in stored.items():
+            to_delete.extend(row_ids[1:] if window in desired else row_ids)
+        to_insert = [window for window in desired if window not in stored]
+
+        conn.executemany('DELETE FROM tutor_availability WHERE id = ?', [(row_id,) for row_id in to_delete])
+        conn.executemany('''
+            INSERT INTO tutor_availability (tutor_id, day_of_week, start_time, end_time, is_available)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(tutor_id, day, to_time(start), to_time(end), is_available)
+              for day, start, end, is_available in sorted(to_insert)])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(to_insert), len(to_delete)
+
+
+class AvailabilityCache:
+    """In-memory copy of each tutor's merged week, keyed by its version"""
+
+    def __init__(self):
+        self._weeks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            cached = self._weeks.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        return None
+
+    def set(self, key, version, week):
+        with self._lock:
+            self._weeks[key] = (version, week)
+
+
+cache = AvailabilityCache()
+
+
+def availability_version(conn, tutor_id):
+    row = conn.execute('SELECT version FROM availability_versions WHERE tutor_id = ?', (tutor_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def get_week(conn, tutor_id, namespace=None):
+    """A tutor's merged windows, served from memory while the version holds"""
+    version = availability_version(conn, tutor_id)
+    week = cache.get((namespace, tutor_id), version)
+    if week is None:
+        week = tuple(merge_windows(_stored_windows(conn, tutor_id)))
+        cache.set((namespace, tutor_id), version, week)
+    return week
+
+
+def is_available(conn, tutor_id, day, start_time, duration=60, namespace=None):
+    """Whether a session fits the tutor's week
+
+    Tutors who have not set any availability are treated as available.
+    """
+    week = get_week(conn, tutor_id, namespace)
+    if not week:
+        return True
+
+    start = to_minutes(start_time)
+    end = start + duration
+    covered = any(d == day and available and s <= start and end <= e for d, s, e, available in week)
+    blocked = any(d == day and not available and s < end and start < e for d, s, e, available in week)
+    return covered and not blocked
+
+
+def day_of_week(value):
+    """Python date -> tutor_availability day number (0 = Sunday)"""
+    return (value.weekday() + 1) % 7
+
+
+def week_to_json(week):
+    return [{'day': day, 'day_name': DAYS[day], 'start_time': to_time(start), 'end_time': to_time(end),
+             'is_available': available} for day, start, end, available in week]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Serving Mode Benchmark for Learning Hub
+Starts the app in development mode (python app.py) and in production mode
+(gunicorn with gunicorn.conf.py) against the same throwaway demo database,
+drives both with the same logged-in clients and prints requests/sec.
+
+The load comes from several client processes, each running a few client
+threads: a single Python process tops out at a few hundred requests/sec
+on its own and would measure itself rather than the server. Run it on a
+machine with spare cores, or point an external generator at the servers.
+
+    python benchmark.py
+    python benchmark.py --duration 20 --processes 8 --clients 4 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+from database import BASE_DIR, migrate, seed_sample_data
+
+PATHS = ['/student', '/course/1', '/schedule_session', '/healthz']
+LOGIN = {'email': 'john.doe@student.edu', 'password': 'password123'}
+
+
+def server_commands(port, workers, threads):
+    """Command line and extra environment for each serving mode"""
+    return {
+        'development (app.run debug)': ([sys.executable, 'app.py'], {'PORT': str(port)}),
+        'production (gunicorn)': ([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                                  {'LEARNING_HUB_BIND': f'127.0.0.1:{port}',
+                                   'LEARNING_HUB_WORKERS': str(workers),
+                                   'LEARNING_HUB_THREADS': str(threads)}),
+    }
+
+
+def wait_until_up(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/healthz', timeout=1).read()
+            return True
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    return False
+
+
+def run_client(base_url, deadline, counts, lock):
+    """Log in once, then request PATHS round-robin until the deadline"""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    opener.open(base_url + '/login', urllib.parse.urlencode(LOGIN).encode(), timeout=10).read()
+
+    ok = errors = 0
+    i = 0
+    while time.time() < deadline:
+        try:
+            opener.open(base_url + PATHS[i % len(PATHS)], timeout=10).read()
+            ok += 1
+        except (urllib.error.URLError, ConnectionError):
+            errors += 1
+        i += 1
+
+    with lock:
+        counts['ok'] += ok
+        counts['errors'] += errors
+
+
+def run_client_process(base_url, deadline, clients):
+    """One load generating process: `clients` threads; returns (ok, errors)"""
+    counts = {'ok': 0, 'errors': 0}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=run_client, args=(base_url, deadline, counts, lock))
+               for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts['ok'], counts['errors']
+
+
+def measure(base_url, processes, clients, duration):
+    """Requests/sec and errors for `processes` x `clients` concurrent clients"""
+    with multiprocessing.Pool(processes) as pool:
+        started = time.time()
+        deadline = started + duration
+        results = pool.starmap(run_client_process, [(base_url, deadline, clients)] * processes)
+        elapsed = time.time() - started
+    return sum(ok for ok, _ in results) / elapsed, sum(errors for _, errors in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare requests/sec of the serving modes')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 2, help='load generating processes')
+    parser.add_argument('--clients', type=int, default=4, help='client threads per load generating process')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = os.path.join(scratch, 'benchmark.db')
+        migrate(db_path)
+        seed_sample_data(db_path)
+
+        for name, (command, extra_env) in server_commands(args.port, args.workers, args.threads).items():
+            env = dict(os.environ, LEARNING_HUB_DB=db_path,
+                       LEARNING_HUB_DIRECTORY_DB=os.path.join(scratch, 'directory.db'), **extra_env)
+            server = subprocess.Popen(command, cwd=BASE_DIR, env=env, start_new_session=True,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            base_url = f'http://127.0.0.1:{args.port}'
+            try:
+                if not wait_until_up(base_url):
+                    print(f"❌ {name}: server did not start")
+                    continue
+                rate, errors = measure(base_url, args.processes, args.clients, args.duration)
+                results.append((name, rate, errors))
+                print(f"{name:32} {rate:10.1f} req/s  ({errors} errors)")
+            finally:
+                os.killpg(server.pid, signal.SIGTERM)
+                server.wait()
+
+    if len(results) == 2 and results[0][1]:
+        print(f"\nProduction mode serves {results[1][1] / results[0][1]:.1f}x the requests/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,57 +1,265 @@
+import hashlib
+import os
+import re
 import sqlite3
+import threading
 from datetime import datetime
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE = os.environ.get('LEARNING_HUB_DB', os.path.join(BASE_DIR, 'learning_hub.db'))
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+SAMPLE_DATA_FILE = os.path.join(BASE_DIR, 'sample_data.sql')
 
-def create_connection():
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+_migration_cache = {}
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class MigrationError(Exception):
+    """Raised when the database schema cannot be brought up to date"""
+
+
+def create_connection(db_path=None):
     """Create a database connection to SQLite database"""
     conn = None
     try:
-        conn = sqlite3.connect('learning_hub.db')
+        conn = sqlite3.connect(db_path or DATABASE)
         conn.row_factory = sqlite3.Row
     except Exception as e:
         print(f"Error connecting to database: {e}")
     return conn
 
 
+class PooledConnection(sqlite3.Connection):
+    """Connection whose close() hands it back to its pool"""
+
+    pool = None
+    checked_out = False
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        elif self.checked_out:
+            # A second close() must not hand the same connection out twice
+            self.checked_out = False
+            if not self.pool.release(self):
+                super().close()
+
+
+class ConnectionPool:
+    """Per-process pool of SQLite connections to one database file
+
+    Connections are created lazily, configured for concurrent readers (WAL)
+    and reused across requests and threads. A pool never crosses a fork:
+    a child process that finds the parent's pool starts a fresh one.
+    """
+
+    def __init__(self, db_path, max_size=8, timeout=30):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        with self._lock:
+            self._check_pid()
+            if self._idle:
+                conn = self._idle.pop()
+                conn.checked_out = True
+                return conn
+
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, factory=PooledConnection,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.pool = self
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn):
+        """Take a connection back; returns False if it should really be closed"""
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+        with self._lock:
+            if self.pid != os.getpid() or len(self._idle) >= self.max_size:
+                return False
+            self._idle.append(conn)
+            return True
+
+    def reset(self):
+        """Forget every idle connection, e.g. in a freshly forked worker"""
+        with self._lock:
+            if self.pid == os.getpid():
+                for conn in self._idle:
+                    conn.pool = None
+                    conn.close()
+            self._idle = []
+            self.pid = os.getpid()
+
+    def _check_pid(self):
+        if self.pid != os.getpid():
+            # Inherited across fork: the parent's handles must not be used here
+            self._idle = []
+            self.pid = os.getpid()
+
+
+def get_pool(db_path=None):
+    """Return this process's connection pool for a database file"""
+    db_path = db_path or DATABASE
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(db_path, ConnectionPool(db_path))
+    return pool
+
+
+def reset_pools():
+    """Drop all pooled connections (called after fork in each worker)"""
+    for pool in list(_pools.values()):
+        pool.reset()
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Return the (version, name, sql, checksum) migrations found in a directory
+
+    Each checksum covers its own file and every migration before it, so the
+    checksum of the newest migration identifies the whole schema history.
+    The result is cached per process.
+    """
+    if directory in _migration_cache:
+        return _migration_cache[directory]
+
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            with open(os.path.join(directory, filename), 'r') as f:
+                migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort()
+
+    result = []
+    checksum = ''
+    for version, name, sql in migrations:
+        if result and result[-1][0] == version:
+            raise MigrationError(f"Duplicate migration version {version}")
+        checksum = hashlib.sha256((checksum + sql).encode('utf-8')).hexdigest()
+        result.append((version, name, sql, checksum))
+
+    _migration_cache[directory] = result
+    return result
+
+
+def split_statements(sql):
+    """Split a SQL script into complete statements"""
+    statements = []
+    buffer = ''
+    for piece in sql.split(';'):
+        buffer += piece + ';'
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if re.sub(r'--[^\n]*', '', statement).strip(' \n;'):
+                statements.append(statement)
+            buffer = ''
+    return statements
+
+
+def schema_is_current(conn, migrations):
+    """Check the applied version and checksum against the latest migration"""
+    latest_version, _, _, latest_checksum = migrations[-1]
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version > latest_version:
+        raise MigrationError(f"Database is at version {version}, newer than this code ({latest_version})")
+    if version != latest_version:
+        return False
+
+    row = conn.execute('SELECT checksum FROM schema_migrations WHERE version = ?',
+                       (latest_version,)).fetchone()
+    if row is None or row[0] != latest_checksum:
+        raise MigrationError(f"Applied migrations do not match migrations/ at version {version}")
+    return True
+
+
+def migrate(db_path=None, directory=MIGRATIONS_DIR):
+    """Apply pending migrations and return the resulting schema version
+
+    When the database is already current this costs one PRAGMA and one
+    primary key lookup, so it is safe to call from every worker process.
+    """
+    migrations = load_migrations(directory)
+    if not migrations:
+        return 0
+
+    conn = sqlite3.connect(db_path or DATABASE, isolation_level=None, timeout=30)
+    try:
+        try:
+            if schema_is_current(conn, migrations):
+                return migrations[-1][0]
+        except sqlite3.OperationalError:
+            # schema_migrations does not exist yet
+            pass
+
+        # Take the write lock, then look again: another process may have
+        # finished migrating while we were waiting for it
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('''CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )''')
+            current = conn.execute('PRAGMA user_version').fetchone()[0]
+            applied = {row[0]: row[1] for row in conn.execute('SELECT version, checksum FROM schema_migrations')}
+
+            for version, name, sql, checksum in migrations:
+                if version <= current:
+                    if version in applied and applied[version] != checksum:
+                        raise MigrationError(f"Migration {version}_{name} was changed after it was applied")
+                    continue
+                for statement in split_statements(sql):
+                    conn.execute(statement)
+                conn.execute('INSERT OR REPLACE INTO schema_migrations (version, name, checksum, applied_at) '
+                             'VALUES (?, ?, ?, ?)', (version, name, checksum, datetime.now()))
+                conn.execute(f'PRAGMA user_version = {version:d}')
+                print(f"Applied migration {version:04d}_{name}")
+
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return migrations[-1][0]
+    finally:
+        conn.close()
+
+
+def seed_sample_data(db_path=None):
+    """Load the demo accounts and content from sample_data.sql"""
+    conn = sqlite3.connect(db_path or DATABASE)
+    try:
+        with open(SAMPLE_DATA_FILE, 'r') as f:
+            conn.executescript(f.read())
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def create_tables():
     """Create tables in the database"""
-    conn = create_connection()
-    if conn is not None:
-        try:
-            with open('schema.sql', 'r') as sql_file:
-                sql_script = sql_file.read()
-                conn.executescript(sql_script)
-                conn.commit()
-                print("Tables created successfully")
-        except Exception as e:
-            print(f"Error creating tables: {e}")
-        finally:
-            conn.close()
-    else:
-        print("Error! Cannot create database connection")
+    try:
+        version = migrate()
+        print(f"Tables created successfully (schema version {version})")
+    except Exception as e:
+        print(f"Error creating tables: {e}")
 
 
 def insert_sample_data():
     """Insert sample data into the database"""
-    conn = create_connection()
-    if conn is not None:
-        try:
-            # Sample users with plain text passwords
-            users = [
-                ('admin', 'admin@learninghub.edu', 'admin', 'password123'),
-                ('john_student', 'john.doe@student.edu', 'student', 'password123'),
-                ('jane_tutor', 'jane.smith@tutor.edu', 'tutor', 'password123'),
-                ('parent1', 'parent@family.com', 'parent', 'password123'),
-                ('content_mgr', 'content@learninghub.edu', 'content_manager', 'password123')
-            ]
-
-            for user in users:
-                conn.execute('''INSERT INTO users (username, email, role, password) 
-                               VALUES (?, ?, ?, ?)''', user)
-
-            conn.commit()
-            print("Sample data inserted successfully")
-        except Exception as e:
-            print(f"Error inserting sample data: {e}")
-        finally:
-            conn.close()
\ No newline at end of file
+    try:
+        seed_sample_data()
+        print("Sample data inserted successfully")
+    except Exception as e:
+        print(f"Error inserting sample data: {e}")
@@ -0,0 +1,133 @@
+"""
+Rendered fragment cache for the dashboards.
+
+Templates wrap expensive sections in
+
+    {% call cache_fragment('courses') %} ... {% endcall %}
+
+and the route calls use_data_version() to say whose data the page shows.
+Fragments are keyed by user, page, fragment name and the user's data
+version from the data_versions table, which triggers bump whenever that
+user's progress, sessions or enrollments change (user 0 tracks shared data
+such as course titles). A changed version therefore never serves stale HTML,
+and older fragments for that user are dropped as soon as it is seen.
+"""
+
+import threading
+from collections import OrderedDict
+
+from flask import g, request
+from markupsafe import Markup
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments, bounded by total size
+
+    Sizes are counted in characters, which for the ASCII-heavy dashboard
+    HTML is the number of bytes CPython stores.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version, key):
+        with self._lock:
+            if self._versions.get(user_id) != version:
+                self._drop_user(user_id)
+                self._versions[user_id] = version
+                self.misses += 1
+                return None
+            html = self._entries.get((user_id, key))
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return html
+
+    def set(self, user_id, version, key, html):
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if self._versions.get(user_id) != version:
+                # The version moved on while this fragment was rendering
+                return
+            entry = (user_id, key)
+            if entry in self._entries:
+                self.size -= len(self._entries.pop(entry))
+            self._entries[entry] = html
+            self._by_user.setdefault(user_id, set()).add(key)
+            self.size += size
+            while self.size > self.max_bytes:
+                (old_user, old_key), old_html = self._entries.popitem(last=False)
+                self.size -= len(old_html)
+                self._by_user[old_user].discard(old_key)
+                if not self._by_user[old_user]:
+                    del self._by_user[old_user]
+                    self._versions.pop(old_user, None)
+
+    def invalidate(self, user_id):
+        """Drop every fragment cached for a user"""
+        with self._lock:
+            self._drop_user(user_id)
+            self._versions.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._versions.clear()
+            self.size = 0
+
+    def _drop_user(self, user_id):
+        for key in self._by_user.pop(user_id, ()):
+            self.size -= len(self._entries.pop((user_id, key)))
+
+
+cache = FragmentCache()
+
+
+def load_data_version(conn, user_id):
+    """Return the (user, shared) data version pair for a user"""
+    versions = dict(conn.execute('SELECT user_id, version FROM data_versions WHERE user_id IN (0, ?)',
+                                 (user_id,)).fetchall())
+    return versions.get(user_id, 0), versions.get(0, 0)
+
+
+def use_data_version(conn, user_id, namespace=None):
+    """Enable fragment caching for this request, scoped to one user's data
+
+    `namespace` tells apart users with the same id in different databases.
+    """
+    g.fragment_scope = ((namespace, user_id), load_data_version(conn, user_id))
+
+
+def cache_fragment(name, *vary, caller):
+    """Jinja {% call %} target: return the cached fragment or render and store it"""
+    scope = g.get('fragment_scope')
+    if scope is None:
+        return caller()
+
+    owner, version = scope
+    key = (request.endpoint, name) + vary
+    html = cache.get(owner, version, key)
+    if html is None:
+        html = Markup(caller())
+        cache.set(owner, version, key, html)
+    return html
+
+
+def init_app(app):
+    """Register the template helper and size the cache from app config"""
+    cache.max_bytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+    app.jinja_env.globals['cache_fragment'] = cache_fragment
@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration for Learning Hub.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Settings can be overridden with environment variables:
+
+    LEARNING_HUB_BIND       address to listen on (default 0.0.0.0:8000)
+    LEARNING_HUB_WORKERS    worker processes (default 2 x CPUs + 1)
+    LEARNING_HUB_THREADS    threads per worker (default 4)
+    LEARNING_HUB_TIMEOUT    seconds before a stuck worker is restarted
+
+Reload and drain:
+    kill -HUP <master>      restart workers gracefully with the same code
+    kill -USR2 <master>     start a new master with new code, then
+    kill -TERM <old master> let the old one finish in-flight requests
+Touch $LEARNING_HUB_DRAIN_FILE first to make /readyz return 503 so the
+load balancer stops sending traffic before the restart.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('LEARNING_HUB_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('LEARNING_HUB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('LEARNING_HUB_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('LEARNING_HUB_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Load the app (migrations, templates, caches) once in the master
+preload_app = True
+
+# Recycle workers now and then so no single process grows without bound
+max_requests = 5000
+max_requests_jitter = 500
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Give each worker its own SQLite connections"""
+    import database
+    database.reset_pools()
+    server.log.info("Worker %s: connection pool ready", worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write the worker's buffered activity events before it goes away"""
+    import activity
+    count = activity.flush()
+    server.log.info("Worker %s: flushed %s activity events", worker.pid, count)
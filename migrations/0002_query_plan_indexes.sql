@@ -0,0 +1,32 @@
+-- 0002_query_plan_indexes.sql - Indexes for the hot queries flagged by query_audit.py
+
+-- schedule_session conflict check and tutor_dashboard session list
+-- (tutor_id, scheduled_date, scheduled_time) also serves the ORDER BY
+CREATE INDEX IF NOT EXISTS idx_sessions_tutor_slot ON sessions(tutor_id, scheduled_date, scheduled_time, status);
+DROP INDEX IF EXISTS idx_sessions_tutor;
+
+-- student_dashboard recent sessions (WHERE student_id ORDER BY scheduled_date DESC)
+CREATE INDEX IF NOT EXISTS idx_sessions_student_date ON sessions(student_id, scheduled_date);
+DROP INDEX IF EXISTS idx_sessions_student;
+
+-- course_view and complete_lesson
+CREATE INDEX IF NOT EXISTS idx_lessons_course_order ON lessons(course_id, lesson_order);
+
+-- student_progress API (WHERE user_id ORDER BY updated_at DESC);
+-- UNIQUE(user_id, course_id) already covers the old idx_progress_user_course
+CREATE INDEX IF NOT EXISTS idx_progress_user_updated ON progress(user_id, updated_at);
+DROP INDEX IF EXISTS idx_progress_user_course;
+
+-- parent_dashboard
+CREATE INDEX IF NOT EXISTS idx_users_parent ON users(parent_id);
+
+-- schedule_session tutor list (WHERE role ORDER BY username)
+CREATE INDEX IF NOT EXISTS idx_users_role_username ON users(role, username);
+DROP INDEX IF EXISTS idx_users_role;
+
+-- admin_dashboard recent registrations and content_dashboard course list
+CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at);
+CREATE INDEX IF NOT EXISTS idx_courses_created ON courses(created_at);
+
+-- tutor_availability page
+CREATE INDEX IF NOT EXISTS idx_availability_tutor_day ON tutor_availability(tutor_id, day_of_week, start_time);
@@ -0,0 +1,123 @@
+-- 0003_data_versions.sql - Per-user data versions for the dashboard fragment cache
+-- Every write that changes what a dashboard shows bumps the version of the
+-- users it affects. user_id 0 tracks shared data (courses, lessons, names).
+-- An UPDATE bumps both the old and the new owner in case the row moved.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- Course progress
+CREATE TRIGGER IF NOT EXISTS trg_progress_insert_version AFTER INSERT ON progress
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_progress_update_version AFTER UPDATE ON progress
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_progress_delete_version AFTER DELETE ON progress
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Enrollments
+CREATE TRIGGER IF NOT EXISTS trg_enrollments_insert_version AFTER INSERT ON enrollments
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_enrollments_update_version AFTER UPDATE ON enrollments
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_enrollments_delete_version AFTER DELETE ON enrollments
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Tutoring sessions appear on both the student's and the tutor's dashboard
+CREATE TRIGGER IF NOT EXISTS trg_sessions_insert_version AFTER INSERT ON sessions
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.tutor_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_update_version AFTER UPDATE ON sessions
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.tutor_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.tutor_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_delete_version AFTER DELETE ON sessions
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.tutor_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- Shared data
+CREATE TRIGGER IF NOT EXISTS trg_courses_insert_version AFTER INSERT ON courses
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_courses_update_version AFTER UPDATE ON courses
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_courses_delete_version AFTER DELETE ON courses
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lessons_insert_version AFTER INSERT ON lessons
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lessons_update_version AFTER UPDATE ON lessons
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lessons_delete_version AFTER DELETE ON lessons
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_rename_version AFTER UPDATE OF username ON users
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
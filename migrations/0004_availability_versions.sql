@@ -0,0 +1,28 @@
+-- 0004_availability_versions.sql - Version counter for cached tutor availability
+-- Bumped by triggers on every change so scheduling lookups can keep each
+-- tutor's week in memory and reload it only when the version moves.
+
+CREATE TABLE IF NOT EXISTS availability_versions (
+    tutor_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_availability_insert_version AFTER INSERT ON tutor_availability
+BEGIN
+    INSERT INTO availability_versions (tutor_id, version) VALUES (NEW.tutor_id, 1)
+        ON CONFLICT(tutor_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_availability_update_version AFTER UPDATE ON tutor_availability
+BEGIN
+    INSERT INTO availability_versions (tutor_id, version) VALUES (NEW.tutor_id, 1)
+        ON CONFLICT(tutor_id) DO UPDATE SET version = version + 1;
+    INSERT INTO availability_versions (tutor_id, version) VALUES (OLD.tutor_id, 1)
+        ON CONFLICT(tutor_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_availability_delete_version AFTER DELETE ON tutor_availability
+BEGIN
+    INSERT INTO availability_versions (tutor_id, version) VALUES (OLD.tutor_id, 1)
+        ON CONFLICT(tutor_id) DO UPDATE SET version = version + 1;
+END;
@@ -0,0 +1,88 @@
+-- 0005_session_ratings.sql - Structured session ratings and per-tutor aggregates
+
+ALTER TABLE sessions ADD COLUMN rating INTEGER CHECK (rating BETWEEN 1 AND 5);
+
+-- Move ratings that end_session used to append to notes (" | Rating: good")
+UPDATE sessions
+SET rating = CASE trim(substr(notes, instr(notes, ' | Rating: ') + 11))
+        WHEN 'excellent' THEN 5 WHEN '5' THEN 5
+        WHEN 'good' THEN 4 WHEN '4' THEN 4
+        WHEN 'average' THEN 3 WHEN '3' THEN 3
+        WHEN 'needs_work' THEN 2 WHEN '2' THEN 2
+        WHEN 'struggling' THEN 1 WHEN '1' THEN 1
+    END,
+    notes = substr(notes, 1, instr(notes, ' | Rating: ') - 1)
+WHERE instr(notes, ' | Rating: ') > 0;
+
+CREATE INDEX IF NOT EXISTS idx_sessions_tutor_rating ON sessions(tutor_id, rating);
+
+-- One row per tutor, kept current by the triggers below
+CREATE TABLE IF NOT EXISTS tutor_stats (
+    tutor_id INTEGER PRIMARY KEY,
+    completed_sessions INTEGER NOT NULL DEFAULT 0,
+    cancelled_sessions INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_total INTEGER NOT NULL DEFAULT 0,
+    average_rating REAL,
+    FOREIGN KEY (tutor_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+INSERT OR REPLACE INTO tutor_stats (tutor_id, completed_sessions, cancelled_sessions, rating_count, rating_total,
+                                    average_rating)
+SELECT tutor_id,
+       SUM(status = 'completed'),
+       SUM(status = 'cancelled'),
+       COUNT(rating),
+       COALESCE(SUM(rating), 0),
+       AVG(rating)
+FROM sessions
+GROUP BY tutor_id;
+
+CREATE INDEX IF NOT EXISTS idx_tutor_stats_rating ON tutor_stats(average_rating);
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_insert_stats AFTER INSERT ON sessions
+BEGIN
+    INSERT INTO tutor_stats (tutor_id, completed_sessions, cancelled_sessions, rating_count, rating_total)
+    VALUES (NEW.tutor_id, NEW.status = 'completed', NEW.status = 'cancelled', NEW.rating IS NOT NULL,
+            COALESCE(NEW.rating, 0))
+    ON CONFLICT(tutor_id) DO UPDATE SET
+        completed_sessions = completed_sessions + excluded.completed_sessions,
+        cancelled_sessions = cancelled_sessions + excluded.cancelled_sessions,
+        rating_count = rating_count + excluded.rating_count,
+        rating_total = rating_total + excluded.rating_total;
+    UPDATE tutor_stats SET average_rating = CASE WHEN rating_count > 0 THEN 1.0 * rating_total / rating_count END
+    WHERE tutor_id = NEW.tutor_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_update_stats AFTER UPDATE OF tutor_id, status, rating ON sessions
+BEGIN
+    UPDATE tutor_stats SET
+        completed_sessions = completed_sessions - (OLD.status = 'completed'),
+        cancelled_sessions = cancelled_sessions - (OLD.status = 'cancelled'),
+        rating_count = rating_count - (OLD.rating IS NOT NULL),
+        rating_total = rating_total - COALESCE(OLD.rating, 0)
+    WHERE tutor_id = OLD.tutor_id;
+    INSERT INTO tutor_stats (tutor_id, completed_sessions, cancelled_sessions, rating_count, rating_total)
+    VALUES (NEW.tutor_id, NEW.status = 'completed', NEW.status = 'cancelled', NEW.rating IS NOT NULL,
+            COALESCE(NEW.rating, 0))
+    ON CONFLICT(tutor_id) DO UPDATE SET
+        completed_sessions = completed_sessions + excluded.completed_sessions,
+        cancelled_sessions = cancelled_sessions + excluded.cancelled_sessions,
+        rating_count = rating_count + excluded.rating_count,
+        rating_total = rating_total + excluded.rating_total;
+    UPDATE tutor_stats SET average_rating = CASE WHEN rating_count > 0 THEN 1.0 * rating_total / rating_count END
+    WHERE tutor_id IN (OLD.tutor_id, NEW.tutor_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_delete_stats AFTER DELETE ON sessions
+BEGIN
+    UPDATE tutor_stats SET
+        completed_sessions = completed_sessions - (OLD.status = 'completed'),
+        cancelled_sessions = cancelled_sessions - (OLD.status = 'cancelled'),
+        rating_count = rating_count - (OLD.rating IS NOT NULL),
+        rating_total = rating_total - COALESCE(OLD.rating, 0),
+        average_rating = CASE WHEN rating_count - (OLD.rating IS NOT NULL) > 0
+                              THEN 1.0 * (rating_total - COALESCE(OLD.rating, 0))
+                                   / (rating_count - (OLD.rating IS NOT NULL)) END
+    WHERE tutor_id = OLD.tutor_id;
+END;
@@ -0,0 +1,51 @@
+-- 0006_sessions_history.sql - Cold storage for finished sessions
+-- archive.py moves completed and cancelled sessions older than a cutoff out
+-- of the hot sessions table; all_sessions is the union for history views.
+
+CREATE TABLE IF NOT EXISTS sessions_history (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL,
+    tutor_id INTEGER NOT NULL,
+    course_id INTEGER,
+    scheduled_date DATE NOT NULL,
+    scheduled_time TIME NOT NULL,
+    duration INTEGER,
+    status TEXT NOT NULL,
+    notes TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    rating INTEGER,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_history_student_date ON sessions_history(student_id, scheduled_date);
+CREATE INDEX IF NOT EXISTS idx_sessions_history_tutor_date ON sessions_history(tutor_id, scheduled_date);
+
+-- Lets the archiver find old finished sessions without scanning
+CREATE INDEX IF NOT EXISTS idx_sessions_status_date ON sessions(status, scheduled_date);
+
+CREATE VIEW IF NOT EXISTS all_sessions AS
+SELECT id, student_id, tutor_id, course_id, scheduled_date, scheduled_time, duration, status, notes,
+       created_at, updated_at, rating, NULL AS archived_at
+FROM sessions
+UNION ALL
+SELECT id, student_id, tutor_id, course_id, scheduled_date, scheduled_time, duration, status, notes,
+       created_at, updated_at, rating, archived_at
+FROM sessions_history;
+
+-- Archived sessions still count towards tutor_stats: skip the decrement
+-- when the deleted row has just been copied into sessions_history
+DROP TRIGGER IF EXISTS trg_sessions_delete_stats;
+CREATE TRIGGER IF NOT EXISTS trg_sessions_delete_stats AFTER DELETE ON sessions
+WHEN NOT EXISTS (SELECT 1 FROM sessions_history WHERE id = OLD.id)
+BEGIN
+    UPDATE tutor_stats SET
+        completed_sessions = completed_sessions - (OLD.status = 'completed'),
+        cancelled_sessions = cancelled_sessions - (OLD.status = 'cancelled'),
+        rating_count = rating_count - (OLD.rating IS NOT NULL),
+        rating_total = rating_total - COALESCE(OLD.rating, 0),
+        average_rating = CASE WHEN rating_count - (OLD.rating IS NOT NULL) > 0
+                              THEN 1.0 * (rating_total - COALESCE(OLD.rating, 0))
+                                   / (rating_count - (OLD.rating IS NOT NULL)) END
+    WHERE tutor_id = OLD.tutor_id;
+END;
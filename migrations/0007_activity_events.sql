@@ -0,0 +1,32 @@
+-- 0007_activity_events.sql - Append-only activity log and consumer cursors
+-- activity.py buffers events in memory and appends them in batches;
+-- downstream rollups read past their own cursor in event_cursors.
+
+CREATE TABLE IF NOT EXISTS activity_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    user_id INTEGER,
+    subject_id INTEGER,
+    data TEXT,
+    occurred_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_activity_events_user_time ON activity_events(user_id, occurred_at);
+CREATE INDEX IF NOT EXISTS idx_activity_events_type_time ON activity_events(event_type, occurred_at);
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_events_no_update BEFORE UPDATE ON activity_events
+BEGIN
+    SELECT RAISE(ABORT, 'activity_events is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_events_no_delete BEFORE DELETE ON activity_events
+BEGIN
+    SELECT RAISE(ABORT, 'activity_events is append-only');
+END;
+
+-- How far each consumer has read
+CREATE TABLE IF NOT EXISTS event_cursors (
+    consumer TEXT PRIMARY KEY,
+    last_event_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,91 @@
+-- 0008_course_recommendations.sql - Co-enrollment course recommendations
+-- course_members is the sparse student x course matrix (active enrollments
+-- and courses with progress), kept current by triggers. Students whose
+-- courses change are queued; recommendations.py rescores them and stores
+-- their top courses in course_recommendations.
+
+CREATE TABLE IF NOT EXISTS course_members (
+    student_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    PRIMARY KEY (student_id, course_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_course_members_course ON course_members(course_id, student_id);
+
+INSERT OR IGNORE INTO course_members (student_id, course_id)
+SELECT student_id, course_id FROM enrollments WHERE status != 'dropped'
+UNION
+SELECT user_id, course_id FROM progress;
+
+CREATE TABLE IF NOT EXISTS recommendation_queue (
+    student_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO recommendation_queue (student_id) SELECT id FROM users WHERE role = 'student';
+
+-- Top courses per student, read by the dashboard in rank order
+CREATE TABLE IF NOT EXISTS course_recommendations (
+    student_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (student_id, rank)
+) WITHOUT ROWID;
+
+-- Membership
+CREATE TRIGGER IF NOT EXISTS trg_enrollments_insert_members AFTER INSERT ON enrollments
+WHEN NEW.status != 'dropped'
+BEGIN
+    INSERT OR IGNORE INTO course_members (student_id, course_id) VALUES (NEW.student_id, NEW.course_id);
+    INSERT OR IGNORE INTO recommendation_queue (student_id) VALUES (NEW.student_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_enrollments_update_members AFTER UPDATE OF student_id, course_id, status ON enrollments
+BEGIN
+    DELETE FROM course_members
+    WHERE student_id = OLD.student_id AND course_id = OLD.course_id
+      AND NOT EXISTS (SELECT 1 FROM progress WHERE user_id = OLD.student_id AND course_id = OLD.course_id)
+      AND NOT EXISTS (SELECT 1 FROM enrollments WHERE student_id = OLD.student_id AND course_id = OLD.course_id
+                                                   AND status != 'dropped');
+    INSERT OR IGNORE INTO course_members (student_id, course_id)
+    SELECT NEW.student_id, NEW.course_id WHERE NEW.status != 'dropped';
+    INSERT OR IGNORE INTO recommendation_queue (student_id) VALUES (OLD.student_id);
+    INSERT OR IGNORE INTO recommendation_queue (student_id) VALUES (NEW.student_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_enrollments_delete_members AFTER DELETE ON enrollments
+BEGIN
+    DELETE FROM course_members
+    WHERE student_id = OLD.student_id AND course_id = OLD.course_id
+      AND NOT EXISTS (SELECT 1 FROM progress WHERE user_id = OLD.student_id AND course_id = OLD.course_id);
+    INSERT OR IGNORE INTO recommendation_queue (student_id) VALUES (OLD.student_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_progress_insert_members AFTER INSERT ON progress
+BEGIN
+    INSERT OR IGNORE INTO course_members (student_id, course_id) VALUES (NEW.user_id, NEW.course_id);
+    INSERT OR IGNORE INTO recommendation_queue (student_id) VALUES (NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_progress_delete_members AFTER DELETE ON progress
+BEGIN
+    DELETE FROM course_members
+    WHERE student_id = OLD.user_id AND course_id = OLD.course_id
+      AND NOT EXISTS (SELECT 1 FROM enrollments WHERE student_id = OLD.user_id AND course_id = OLD.course_id
+                                                   AND status != 'dropped');
+    INSERT OR IGNORE INTO recommendation_queue (student_id) VALUES (OLD.user_id);
+END;
+
+-- New recommendations change the student's dashboard
+CREATE TRIGGER IF NOT EXISTS trg_recommendations_insert_version AFTER INSERT ON course_recommendations
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (NEW.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recommendations_delete_version AFTER DELETE ON course_recommendations
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (OLD.student_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
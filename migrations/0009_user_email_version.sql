@@ -0,0 +1,11 @@
+-- 0009_user_email_version.sql - Email changes invalidate cached fragments too
+-- Dashboards render other users' emails as well as their names (the tutor's
+-- students section), so an email change bumps the shared data version just
+-- like a rename.
+
+DROP TRIGGER IF EXISTS trg_users_rename_version;
+CREATE TRIGGER IF NOT EXISTS trg_users_rename_version AFTER UPDATE OF username, email ON users
+BEGIN
+    INSERT INTO data_versions (user_id, version) VALUES (0, 1)
+        ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
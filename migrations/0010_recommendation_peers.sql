@@ -0,0 +1,18 @@
+-- 0010_recommendation_peers.sql - Rescore everyone in a course whose members change
+-- A student joining or leaving a course changes the co-occurrence and
+-- popularity terms of every other student in that course, so all of them
+-- are queued, not only the student whose own courses changed. The queue's
+-- primary key collapses repeated changes into one rescore per student, and
+-- recommendations.refresh() works through it a batch per transaction.
+
+CREATE TRIGGER IF NOT EXISTS trg_course_members_insert_peers AFTER INSERT ON course_members
+BEGIN
+    INSERT OR IGNORE INTO recommendation_queue (student_id)
+    SELECT student_id FROM course_members WHERE course_id = NEW.course_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_course_members_delete_peers AFTER DELETE ON course_members
+BEGIN
+    INSERT OR IGNORE INTO recommendation_queue (student_id)
+    SELECT student_id FROM course_members WHERE course_id = OLD.course_id;
+END;
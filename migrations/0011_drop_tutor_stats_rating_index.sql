@@ -0,0 +1,7 @@
+-- 0011_drop_tutor_stats_rating_index.sql - Drop an index no query uses
+-- The tutor listing drives from users (every tutor, with or without a
+-- tutor_stats row) and breaks rating ties by username, so it sorts the
+-- tutors in a temporary B-tree and never reads idx_tutor_stats_rating;
+-- the index only cost a write on every rating change.
+
+DROP INDEX IF EXISTS idx_tutor_stats_rating;
@@ -0,0 +1,21 @@
+-- 0001_directory.sql - Global directory of organizations and their users
+-- Lives in its own database file; each organization's data is in its shard.
+
+CREATE TABLE IF NOT EXISTS organizations (
+    slug TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    db_file TEXT,  -- relative to the shards directory; NULL for the default database
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO organizations (slug, name, db_file) VALUES ('default', 'Learning Hub', NULL);
+
+-- Which shard to open for an email at login, and global email uniqueness
+CREATE TABLE IF NOT EXISTS user_directory (
+    email TEXT PRIMARY KEY,
+    organization TEXT NOT NULL,
+    user_id INTEGER,
+    FOREIGN KEY (organization) REFERENCES organizations (slug)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_directory_organization ON user_directory(organization);
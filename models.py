@@ -1,31 +1,145 @@
+"""
+Row models for the Learning Hub tables.
 
-class User:
-    def __init__(self, id, username, email, role, created_at):
-        self.id = id
-        self.username = username
-        self.email = email
-        self.role = role
-        self.created_at = created_at
-
-class Course:
-    def __init__(self, id, title, description, created_at):
-        self.id = id
-        self.title = title
-        self.description = description
-        self.created_at = created_at
-
-class Lesson:
-    def __init__(self, id, course_id, title, content, lesson_order):
-        self.id = id
-        self.course_id = course_id
-        self.title = title
-        self.content = content
-        self.lesson_order = lesson_order
-
-class Progress:
-    def __init__(self, id, user_id, course_id, progress, updated_at):
-        self.id = id
-        self.user_id = user_id
-        self.course_id = course_id
-        self.progress = progress
-        self.updated_at = updated_at
\ No newline at end of file
+Models use __slots__, so a row costs one small object instead of a
+sqlite3.Row plus a dict. fetch_all()/fetch_one() map result columns onto a
+model directly; columns that are not part of the table (joined names,
+aggregates) become extra slots on a generated subclass, so every query
+gets a class whose attributes match its SELECT list.
+"""
+
+import keyword
+
+_row_classes = {}
+
+
+class Model:
+    """Base class for slot-based row models"""
+    __slots__ = ()
+    _fields = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self._fields, args):
+            setattr(self, name, value)
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        # Keep row['column'] working for code written against sqlite3.Row
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def keys(self):
+        return self._fields
+
+    def to_dict(self):
+        """Plain dict of the loaded columns, ready for jsonify()"""
+        return {name: getattr(self, name) for name in self._fields if hasattr(self, name)}
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name, None)!r}' for name in self._fields)
+        return f'{type(self).__name__}({values})'
+
+
+class User(Model):
+    __slots__ = _fields = ('id', 'username', 'email', 'password', 'role', 'parent_id', 'created_at', 'updated_at')
+
+
+class Course(Model):
+    __slots__ = _fields = ('id', 'title', 'description', 'difficulty_level', 'estimated_duration', 'created_by',
+                           'created_at', 'updated_at')
+
+
+class Lesson(Model):
+    __slots__ = _fields = ('id', 'course_id', 'title', 'content', 'lesson_order', 'duration', 'created_at')
+
+
+class Progress(Model):
+    __slots__ = _fields = ('id', 'user_id', 'course_id', 'lesson_id', 'progress', 'completed', 'last_accessed',
+                           'updated_at')
+
+
+class TutoringSession(Model):
+    __slots__ = _fields = ('id', 'student_id', 'tutor_id', 'course_id', 'scheduled_date', 'scheduled_time',
+                           'duration', 'status', 'notes', 'created_at', 'updated_at', 'rating')
+
+
+class TutorStats(Model):
+    __slots__ = _fields = ('tutor_id', 'completed_sessions', 'cancelled_sessions', 'rating_count', 'rating_total',
+                           'average_rating')
+
+
+class ActivityEvent(Model):
+    __slots__ = _fields = ('id', 'event_type', 'user_id', 'subject_id', 'data', 'occurred_at')
+
+
+class Availability(Model):
+    __slots__ = _fields = ('id', 'tutor_id', 'day_of_week', 'start_time', 'end_time', 'is_available', 'created_at')
+
+
+def row_class(model, columns):
+    """Return the subclass of `model` whose constructor takes exactly `columns`
+
+    The constructor is generated once per (model, column list) and assigns
+    each column straight to its slot. Duplicate names keep the first value,
+    like sqlite3.Row; names that are not identifiers, Python keywords or
+    Model attributes (keys, to_dict) are skipped, so alias computed columns
+    (COUNT(*) AS count) and avoid those names.
+    """
+    key = (model, columns)
+    cls = _row_classes.get(key)
+    if cls is not None:
+        return cls
+
+    fields = []
+    body = []
+    for position, name in enumerate(columns):
+        if (name.isidentifier() and not keyword.iskeyword(name) and not name.startswith('_')
+                and not hasattr(Model, name) and name not in fields):
+            fields.append(name)
+            body.append(f'    self.{name} = _{position}')
+    arguments = ', '.join(f'_{position}' for position in range(len(columns)))
+    namespace = {}
+    exec(f"def __init__(self, {arguments}):\n" + ('\n'.join(body) or '    pass'), namespace)
+
+    extras = tuple(name for name in fields if name not in model._fields)
+    cls = type(model.__name__, (model,), {
+        '__slots__': extras,
+        '_fields': tuple(fields),
+        '__init__': namespace['__init__'],
+    })
+    _row_classes[key] = cls
+    return cls
+
+
+class RowMapper:
+    """sqlite3 row_factory that builds `model` instances from result tuples"""
+    __slots__ = ('model', 'description', 'cls')
+
+    def __init__(self, model):
+        self.model = model
+        self.description = None
+        self.cls = None
+
+    def __call__(self, cursor, row):
+        # description is the same object for every row of one statement
+        if cursor.description is not self.description:
+            self.description = cursor.description
+            self.cls = row_class(self.model, tuple(column[0] for column in self.description))
+        return self.cls(*row)
+
+
+def fetch_all(conn, model, sql, params=()):
+    """Run a query and return its rows as `model` instances"""
+    cursor = conn.cursor()
+    cursor.row_factory = RowMapper(model)
+    return cursor.execute(sql, params).fetchall()
+
+
+def fetch_one(conn, model, sql, params=()):
+    """Run a query and return the first row as a `model` instance, or None"""
+    cursor = conn.cursor()
+    cursor.row_factory = RowMapper(model)
+    return cursor.execute(sql, params).fetchone()
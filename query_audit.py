@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Query Plan Auditor for Learning Hub
+Collects every SQL statement the application issues, runs EXPLAIN QUERY PLAN
+against a realistically sized scratch database and reports full table scans
+and temporary B-tree sorts, together with a proposed covering index.
+
+SQL built with f-strings is resolved from the constants it interpolates
+(module constants, placeholder lists, conditional column names), auditing
+every variant it can produce. SQL the auditor cannot resolve is reported
+as a finding of its own, so --check fails until it is made auditable or
+accepted into the baseline.
+
+    python query_audit.py                   # print the report
+    python query_audit.py --check           # exit 1 if a new finding appears
+    python query_audit.py --update-baseline # accept the current findings
+"""
+
+import argparse
+import ast
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+
+from database import BASE_DIR, load_migrations, migrate, split_statements
+from shards import DIRECTORY_MIGRATIONS_DIR
+
+SOURCE_FILES = ['activity.py', 'app.py', 'archive.py', 'auth.py', 'availability.py', 'fragment_cache.py',
+                'recommendations.py', 'session_lifecycle.py', 'shards.py', 'snapshot.py']
+BASELINE_FILE = os.path.join(BASE_DIR, 'query_audit_baseline.json')
+
+# Functions that run SQL, and the position of the SQL string in their arguments
+SQL_ARGUMENT = {'execute': 0, 'executemany': 0, 'fetch_all': 2, 'fetch_one': 2, '_update_directory': 0}
+SQL_VERBS = ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH')
+UNRESOLVED = 'UNRESOLVED SQL'
+
+# Upper bound on the variants audited for one f-string
+MAX_VARIANTS = 16
+
+# Row counts for the scratch database, roughly a mid-sized school
+SAMPLE_SIZES = {
+    'students': 5000,
+    'tutors': 200,
+    'parents': 2000,
+    'courses': 300,
+    'lessons_per_course': 12,
+    'enrollments_per_student': 4,
+    'sessions': 60000,
+    'notifications': 20000,
+}
+
+_CLAUSE_END = r'(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|$)'
+_KEYWORDS = {'ON', 'WHERE', 'JOIN', 'LEFT', 'INNER', 'ORDER', 'GROUP', 'LIMIT', 'AS', 'USING'}
+
+
+def _assignments(statements):
+    """{name: [assigned value nodes]} for simple and tuple-unpacking assignments"""
+    assigned = {}
+    for node in statements:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                assigned.setdefault(target.id, []).append(node.value)
+            elif isinstance(target, ast.Tuple):
+                for i, element in enumerate(target.elts):
+                    if isinstance(element, ast.Name):
+                        assigned.setdefault(element.id, []).append(ast.Subscript(node.value, ast.Constant(i)))
+    return assigned
+
+
+def _combinations(parts):
+    return itertools.islice(itertools.product(*parts), MAX_VARIANTS)
+
+
+def _values(node, scopes, seen=()):
+    """Every value a constant expression can take, or None if it depends on runtime data"""
+    if isinstance(node, ast.Constant):
+        return [node.value]
+    if isinstance(node, ast.Name):
+        if node.id in seen:
+            return None
+        for scope in scopes:
+            if node.id in scope:
+                values = [_values(value, scopes, seen + (node.id,)) for value in scope[node.id]]
+                return None if None in values else [v for options in values for v in options]
+        return None
+    if isinstance(node, ast.IfExp):
+        body, orelse = _values(node.body, scopes, seen), _values(node.orelse, scopes, seen)
+        return None if body is None or orelse is None else body + orelse
+    if isinstance(node, (ast.Tuple, ast.List)):
+        parts = [_values(element, scopes, seen) for element in node.elts]
+        return None if None in parts else [tuple(c) for c in _combinations(parts)]
+    if isinstance(node, ast.Dict):
+        keys = [_values(key, scopes, seen) if key else None for key in node.keys]
+        parts = [_values(value, scopes, seen) for value in node.values]
+        if None in keys or None in parts:
+            return None
+        return [dict(zip([k[0] for k in keys], c)) for c in _combinations(parts)]
+    if isinstance(node, ast.Subscript):
+        containers = _values(node.value, scopes, seen)
+        # An index we cannot know (e.g. a parameter) may select any entry
+        index = _values(node.slice, scopes, seen)
+        if containers is None:
+            return None
+        values = []
+        for container in containers:
+            if isinstance(container, dict):
+                values += list(container.values()) if index is None else [container[i] for i in index if i in container]
+            elif index is not None and isinstance(container, (tuple, list)):
+                values += [container[i] for i in index if isinstance(i, int) and -len(container) <= i < len(container)]
+            else:
+                return None
+        return values or None
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'join'
+            and isinstance(node.func.value, ast.Constant) and len(node.args) == 1):
+        separator, argument = node.func.value.value, node.args[0]
+        if isinstance(argument, (ast.GeneratorExp, ast.ListComp)):
+            # One element stands in for a list of any length, e.g. '?' placeholders
+            return _values(argument.elt, scopes, seen)
+        items = _values(argument, scopes, seen)
+        if items is None or not all(isinstance(item, (tuple, list)) for item in items):
+            return None
+        return [separator.join(map(str, item)) for item in items]
+    if isinstance(node, ast.JoinedStr):
+        parts = [_values(value, scopes, seen) for value in node.values]
+        return None if None in parts else [''.join(c) for c in _combinations(parts)]
+    if isinstance(node, ast.FormattedValue):
+        values = _values(node.value, scopes, seen)
+        return None if values is None else [str(value) for value in values]
+    return None
+
+
+def _enclosing_function(node, parents):
+    while node in parents:
+        node = parents[node]
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return node
+    return None
+
+
+def collect_statements(files=SOURCE_FILES):
+    """Find every SQL statement passed to .execute() and friends in the given files
+
+    Statements whose text cannot be worked out statically are returned with
+    `resolved` False and their source expression as `sql`.
+    """
+    statements = []
+    for filename in files:
+        path = os.path.join(BASE_DIR, filename)
+        with open(path, 'r') as f:
+            tree = ast.parse(f.read(), filename=filename)
+        parents = {child: parent for parent in ast.walk(tree) for child in ast.iter_child_nodes(parent)}
+        module_scope = _assignments(tree.body)
+
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, 'id', None)
+            # conn.execute(sql, ...) or fetch_all/fetch_one(conn, Model, sql, ...)
+            position = SQL_ARGUMENT.get(name)
+            if position is None or len(node.args) <= position:
+                continue
+            argument = node.args[position]
+            function = _enclosing_function(node, parents)
+            if (function is not None and function.name in SQL_ARGUMENT and isinstance(argument, ast.Name)
+                    and argument.id in {a.arg for a in function.args.args}):
+                # A wrapper passing its caller's SQL on: audited at the call sites
+                continue
+
+            scopes = [module_scope] if function is None else [_assignments(ast.walk(function)), module_scope]
+            variants = _values(argument, scopes)
+            if variants is None or not all(isinstance(sql, str) for sql in variants):
+                statements.append({'file': filename, 'line': node.lineno, 'sql': ast.unparse(argument),
+                                   'resolved': False})
+                continue
+            for sql in dict.fromkeys(' '.join(sql.split()) for sql in variants):
+                if sql.upper().startswith(SQL_VERBS):
+                    statements.append({'file': filename, 'line': node.lineno, 'sql': sql, 'resolved': True})
+    statements.sort(key=lambda s: (s['file'], s['line']))
+    return statements
+
+
+def build_sample_database(path, sizes=SAMPLE_SIZES, seed=42):
+    """Create a migrated scratch database filled with synthetic rows"""
+    rng = random.Random(seed)
+    migrate(path)
+    conn = sqlite3.connect(path)
+    # The directory tables live in their own database file in production;
+    # here they share the scratch file, unversioned, so their queries can be explained
+    for _, _, sql, _ in load_migrations(DIRECTORY_MIGRATIONS_DIR):
+        for statement in split_statements(sql):
+            conn.execute(statement)
+
+    users = []
+    for role, count in (('student', sizes['students']), ('tutor', sizes['tutors']),
+                        ('parent', sizes['parents'])):
+        for i in range(count):
+            users.append((f'{role}{i}', f'{role}{i}@example.edu', 'x', role,
+                          f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'))
+    conn.executemany('INSERT INTO users (username, email, password, role, created_at) VALUES (?, ?, ?, ?, ?)', users)
+
+    ids = {role: [row[0] for row in conn.execute('SELECT id FROM users WHERE role = ?', (role,))]
+           for role in ('student', 'tutor', 'parent')}
+    conn.executemany('UPDATE users SET parent_id = ? WHERE id = ?',
+                     [(rng.choice(ids['parent']), student) for student in ids['student'] if rng.random() < 0.6])
+
+    conn.executemany('INSERT INTO courses (title, description, created_at) VALUES (?, ?, ?)',
+                     [(f'Course {i}', 'Synthetic course', f'2024-01-{i % 28 + 1:02d}')
+                      for i in range(sizes['courses'])])
+    course_ids = [row[0] for row in conn.execute('SELECT id FROM courses')]
+    conn.executemany('INSERT INTO lessons (course_id, title, lesson_order) VALUES (?, ?, ?)',
+                     [(course, f'Lesson {n}', n) for course in course_ids
+                      for n in range(1, sizes['lessons_per_course'] + 1)])
+
+    enrollments = set()
+    for student in ids['student']:
+        for course in rng.sample(course_ids, sizes['enrollments_per_student']):
+            enrollments.add((student, course))
+    conn.executemany('INSERT INTO enrollments (student_id, course_id) VALUES (?, ?)', sorted(enrollments))
+    conn.executemany('INSERT INTO progress (user_id, course_id, progress, updated_at) VALUES (?, ?, ?, ?)',
+                     [(s, c, rng.randint(0, 100), f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}')
+                      for s, c in sorted(enrollments)])
+
+    statuses = ['scheduled', 'in_progress', 'completed', 'completed', 'completed', 'cancelled']
+    conn.executemany('''INSERT INTO sessions (student_id, tutor_id, course_id, scheduled_date, scheduled_time, status)
+                        VALUES (?, ?, ?, ?, ?, ?)''',
+                     [(rng.choice(ids['student']), rng.choice(ids['tutor']), rng.choice(course_ids),
+                       f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}', f'{rng.randint(8, 19):02d}:00',
+                       rng.choice(statuses)) for _ in range(sizes['sessions'])])
+    conn.executemany('INSERT INTO tutor_availability (tutor_id, day_of_week, start_time, end_time) VALUES (?, ?, ?, ?)',
+                     [(tutor, day, '09:00', '17:00') for tutor in ids['tutor'] for day in range(1, 6)])
+    conn.executemany('INSERT INTO notifications (user_id, title, message) VALUES (?, ?, ?)',
+                     [(rng.choice(ids['student']), 'Note', 'Synthetic') for _ in range(sizes['notifications'])])
+    conn.execute("INSERT INTO user_directory (email, organization, user_id) SELECT email, 'default', id FROM users")
+
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+
+def explain(conn, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    params = [None] * sql.count('?')
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def plan_problems(plan, sql, views=()):
+    """Pick the full scans and temporary B-tree sorts out of a query plan
+
+    A scan that walks an index is only a problem when the statement filters
+    rows; without a WHERE clause it is the cheapest way to read them in order.
+    A scan of a materialized view only reads rows its own plan lines already
+    produced, so it is left to those lines.
+    """
+    filtered = re.search(r'\bWHERE\b', sql, re.I) is not None
+    aliases = _table_aliases(sql)
+    problems = []
+    for detail in plan:
+        scan = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if scan and 'CONSTANT ROW' not in detail:
+            if aliases.get(scan.group(1).lower()) in views:
+                continue
+            if filtered or ' INDEX ' not in detail:
+                problems.append(detail)
+        elif 'USE TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
+
+
+def _table_aliases(sql):
+    """Map every alias (and bare table name) used in FROM/JOIN to its table"""
+    aliases = {}
+    for table, alias in re.findall(r'\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.I):
+        aliases[table.lower()] = table.lower()
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def _columns_for(expression, table, aliases):
+    """Columns of `table` referenced in a SQL fragment, in order of appearance"""
+    single_table = len(set(aliases.values())) == 1
+    expression = re.sub(r"'[^']*'", '', expression)
+    columns = []
+    for qualifier, column in re.findall(r'(?:\b(\w+)\.)?\b([A-Za-z_]\w*)\b', expression):
+        if qualifier:
+            if aliases.get(qualifier.lower()) != table:
+                continue
+        elif not single_table or column.upper() in _KEYWORDS | {'AND', 'OR', 'IN', 'IS', 'NOT', 'NULL',
+                                                               'ASC', 'DESC', 'BY', 'LIKE', 'BETWEEN'}:
+            continue
+        if column.lower() not in columns and column.lower() not in aliases:
+            columns.append(column.lower())
+    return columns
+
+
+def recommend_index(sql, detail, views=()):
+    """Propose a covering index for the table named in a plan problem (never for a view)"""
+    aliases = _table_aliases(sql)
+    match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+    if match:
+        table = aliases.get(match.group(1).lower(), match.group(1).lower())
+    elif len(set(aliases.values())) == 1:
+        table = next(iter(aliases.values()))
+    else:
+        # Temp B-tree on a join: index the table the ORDER BY column belongs to
+        order = re.search(r'\bORDER\s+BY\s+(\w+)\.', sql, re.I)
+        if not order:
+            return None
+        table = aliases.get(order.group(1).lower())
+        if table is None:
+            return None
+    if table in views:
+        return None
+
+    where = re.search(r'\bWHERE\b(.*?)' + _CLAUSE_END, sql, re.I | re.S)
+    joins = ' '.join(re.findall(r'\bON\b(.*?)(?=\bJOIN\b|\bLEFT\b|\bWHERE\b|\bORDER\b|$)', sql, re.I | re.S))
+    order = re.search(r'\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|$)', sql, re.I | re.S)
+
+    equality, ranges = [], []
+    if where:
+        for condition in re.split(r'\bAND\b', where.group(1), flags=re.I):
+            target = equality if re.search(r'=|\bIN\b', condition, re.I) else ranges
+            target.extend(c for c in _columns_for(condition, table, aliases) if c not in equality + ranges)
+    # Join columns only help when this table is the one being looked up
+    join_columns = [] if equality else [c for c in _columns_for(joins, table, aliases) if c not in ranges]
+    order_columns = _columns_for(order.group(1), table, aliases) if order else []
+
+    key = equality + join_columns + [c for c in order_columns if c not in equality + join_columns] + ranges
+    if not key:
+        return None
+    name = 'idx_{}_{}'.format(table, '_'.join(key))[:60]
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(key)});"
+
+
+def _problem_kind(detail):
+    """A plan problem without the index name, which changes as indexes are added"""
+    return re.sub(r' USING .*', '', detail)
+
+
+def finding_key(statement, detail):
+    """Stable identifier for a finding, independent of line numbers"""
+    digest = hashlib.sha1(statement['sql'].encode('utf-8')).hexdigest()[:12]
+    return f"{statement['file']}:{digest}:{_problem_kind(detail)}"
+
+
+def audit(db_path, statements):
+    """Explain every statement and return the findings with index proposals"""
+    conn = sqlite3.connect(db_path)
+    findings = []
+    try:
+        # sync_directory reads users from the shard it attaches as `shard`
+        conn.execute('ATTACH DATABASE ? AS shard', (db_path,))
+        views = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        for statement in statements:
+            if not statement['resolved']:
+                findings.append(dict(statement, detail=UNRESOLVED, key=finding_key(statement, UNRESOLVED),
+                                     proposal=None, verified=False))
+                continue
+            plan = explain(conn, statement['sql'])
+            for detail in plan_problems(plan, statement['sql'], views):
+                proposal = recommend_index(statement['sql'], detail, views)
+                verified = False
+                if proposal:
+                    # Try the index and check the problem actually goes away
+                    conn.execute('SAVEPOINT proposal')
+                    try:
+                        conn.execute(proposal)
+                        remaining = plan_problems(explain(conn, statement['sql']), statement['sql'], views)
+                        verified = _problem_kind(detail) not in map(_problem_kind, remaining)
+                    except sqlite3.Error:
+                        pass
+                    conn.execute('ROLLBACK TO proposal')
+                    conn.execute('RELEASE proposal')
+                findings.append(dict(statement, detail=detail, key=finding_key(statement, detail),
+                                     proposal=proposal, verified=verified))
+    finally:
+        conn.close()
+    return findings
+
+
+def load_baseline(path=BASELINE_FILE):
+    """Return the set of accepted finding keys"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r') as f:
+        return set(json.load(f)['accepted'])
+
+
+def save_baseline(findings, path=BASELINE_FILE):
+    """Accept the current findings as the baseline"""
+    with open(path, 'w') as f:
+        json.dump({'accepted': sorted({finding['key'] for finding in findings})}, f, indent=2)
+        f.write('\n')
+
+
+def print_report(findings, baseline):
+    """Print findings, marking the ones that are not in the baseline"""
+    if not findings:
+        print("✅ No full scans or temp B-tree sorts found")
+        return
+    for finding in findings:
+        marker = '   ' if finding['key'] in baseline else 'NEW'
+        print(f"{marker} {finding['file']}:{finding['line']}  {finding['detail']}")
+        print(f"      {finding['sql'][:110]}")
+        if finding['proposal']:
+            status = 'removes the problem' if finding['verified'] else 'does not remove the problem'
+            print(f"      -> {finding['proposal']}  ({status})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Audit query plans of Learning Hub SQL statements')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 on findings not in the baseline')
+    parser.add_argument('--update-baseline', action='store_true', help='accept the current findings')
+    parser.add_argument('--database', help='audit an existing database instead of a synthetic one')
+    args = parser.parse_args(argv)
+
+    statements = collect_statements()
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = args.database
+        if db_path is None:
+            db_path = os.path.join(scratch, 'audit.db')
+            build_sample_database(db_path)
+        findings = audit(db_path, statements)
+
+    print(f"Audited {len(statements)} statements")
+    if args.update_baseline:
+        save_baseline(findings)
+        print(f"Baseline updated with {len(findings)} accepted findings")
+        return 0
+
+    baseline = load_baseline()
+    print_report(findings, baseline)
+    new = [finding for finding in findings if finding['key'] not in baseline]
+    if args.check and new:
+        print(f"❌ {len(new)} new query plan problem(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Course recommendations from co-enrollment.
+
+course_members holds the sparse student x course matrix. A student's
+candidate courses are scored by item-item cosine similarity: for each
+course they take, every other course that peers of that course also take
+scores
+
+    together(course, candidate) / sqrt(members(course) * members(candidate))
+
+summed over the student's courses. The co-occurrence counts come from one
+indexed GROUP BY over the student's neighbourhood, so only students sharing
+a course are read, never the whole matrix. Students with no peers yet get
+the most popular courses instead.
+
+Triggers queue a student whenever their courses change, together with
+every other student in the courses that gained or lost a member (their
+co-occurrence counts moved too); refresh() rescores the queued students and
+replaces their top_k rows in course_recommendations, which the dashboard
+reads with one primary key range lookup. The app rescores a student right
+after its own progress and enrollment writes (refresh_if_queued), drains
+each shard's queue at startup, which is what scores everyone after
+migration 0008, and runs a Refresher in every worker that drains the
+queues each refresh interval, which is where the queued peers get rescored.
+
+Only the popularity term of courses two steps away (candidates a student
+reaches through a peer) is not followed by the triggers; --all rescores
+everyone to pick that drift up, e.g. nightly.
+
+    python recommendations.py                 # rescore queued students in every organization
+    python recommendations.py --all           # rescore every student
+    python recommendations.py --interval 60   # keep draining the queues
+    python recommendations.py --organization acme
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from models import Course, fetch_all
+from shards import router
+
+DEFAULT_TOP_K = 5
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_REFRESH_INTERVAL = 30
+
+
+def course_popularity(conn):
+    """{course_id: number of students taking it}"""
+    return dict(conn.execute('SELECT course_id, COUNT(*) FROM course_members GROUP BY course_id').fetchall())
+
+
+def score_courses(conn, student_id, popularity, top_k=DEFAULT_TOP_K):
+    """The student's top_k (course_id, score) pairs, best first"""
+    mine = {row[0] for row in conn.execute('SELECT course_id FROM course_members WHERE student_id = ?',
+                                           (student_id,))}
+
+    scores = Counter()
+    rows = conn.execute('''
+        SELECT mine.course_id, other.course_id, COUNT(*)
+        FROM course_members mine
+        JOIN course_members peer ON peer.course_id = mine.course_id AND peer.student_id != mine.student_id
+        JOIN course_members other ON other.student_id = peer.student_id
+        WHERE mine.student_id = ?
+        GROUP BY mine.course_id, other.course_id
+    ''', (student_id,))
+    for course_id, candidate, together in rows:
+        if candidate not in mine:
+            scores[candidate] += together / math.sqrt(popularity[course_id] * popularity[candidate])
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+    if len(ranked) < top_k:
+        # Not enough co-enrollment yet: fill up with the most popular courses
+        chosen = mine | {course_id for course_id, _ in ranked}
+        popular = sorted((course_id for course_id in popularity if course_id not in chosen),
+                         key=lambda course_id: (-popularity[course_id], course_id))
+        ranked += [(course_id, 0.0) for course_id in popular[:top_k - len(ranked)]]
+    return ranked
+
+
+def _store(conn, student_id, ranked):
+    conn.execute('DELETE FROM course_recommendations WHERE student_id = ?', (student_id,))
+    conn.executemany('INSERT INTO course_recommendations (student_id, rank, course_id, score) VALUES (?, ?, ?, ?)',
+                     [(student_id, rank, course_id, score) for rank, (course_id, score) in enumerate(ranked, 1)])
+
+
+def _rescore(conn, student_ids, top_k):
+    popularity = course_popularity(conn)
+    for student_id in student_ids:
+        _store(conn, student_id, score_courses(conn, student_id, popularity, top_k))
+    conn.executemany('DELETE FROM recommendation_queue WHERE student_id = ?',
+                     [(student_id,) for student_id in student_ids])
+
+
+def refresh_students(conn, student_ids, top_k=DEFAULT_TOP_K):
+    """Rescore the given students now and take them off the queue"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        _rescore(conn, student_ids, top_k)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(student_ids)
+
+
+def refresh_if_queued(conn, student_id, top_k=DEFAULT_TOP_K):
+    """Rescore a student whose courses changed since their last refresh; returns whether they were queued"""
+    if conn.execute('SELECT 1 FROM recommendation_queue WHERE student_id = ?', (student_id,)).fetchone() is None:
+        return False
+    refresh_students(conn, [student_id], top_k)
+    return True
+
+
+def refresh(conn, top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_SIZE):
+    """Rescore every queued student, a batch per transaction; returns how many
+
+    Each batch is read inside its write transaction, so processes draining
+    the same queue never rescore the same students twice.
+    """
+    refreshed = 0
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            batch = [row[0] for row in conn.execute('SELECT student_id FROM recommendation_queue LIMIT ?',
+                                                    (batch_size,))]
+            _rescore(conn, batch, top_k)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if not batch:
+            return refreshed
+        refreshed += len(batch)
+
+
+class Refresher:
+    """Background thread draining the queue of every database once per interval"""
+
+    def __init__(self, databases, interval=DEFAULT_REFRESH_INTERVAL, top_k=DEFAULT_TOP_K):
+        self.databases = databases
+        self.interval = interval
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_running(self):
+        # Threads do not survive fork: each worker process starts its own
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, name='recommendations-refresh', daemon=True).start()
+
+    def refresh_all(self):
+        """Drain every database's queue now; returns the number of students rescored"""
+        refreshed = 0
+        for db_path in self.databases():
+            conn = sqlite3.connect(db_path, timeout=30)
+            try:
+                refreshed += refresh(conn, self.top_k)
+            finally:
+                conn.close()
+        return refreshed
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh_all()
+            except sqlite3.Error as e:
+                print(f"Error refreshing recommendations: {e}")
+
+
+refresher = None
+
+
+def init_app(app, databases):
+    """Drain the queues in the background of every worker process
+
+    `databases` returns the database files to drain. The thread starts with
+    a worker's first request, so a preforking master never runs one.
+    """
+    global refresher
+    refresher = Refresher(databases, app.config.get('RECOMMENDATIONS_REFRESH_INTERVAL', DEFAULT_REFRESH_INTERVAL))
+    app.before_request(refresher.ensure_running)
+
+
+def queue_all(conn):
+    """Queue every student, e.g. so drifted co-enrollment counts get picked up"""
+    conn.execute("INSERT OR IGNORE INTO recommendation_queue (student_id) SELECT id FROM users WHERE role = 'student'")
+    conn.commit()
+
+
+def recommended_courses(conn, student_id):
+    """A student's stored recommendations, best first"""
+    return fetch_all(conn, Course, '''
+        SELECT c.*, r.score
+        FROM course_recommendations r
+        JOIN courses c ON r.course_id = c.id
+        WHERE r.student_id = ?
+        ORDER BY r.rank
+    ''', (student_id,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh course recommendations')
+    parser.add_argument('--all', action='store_true', help='rescore every student, not just queued ones')
+    parser.add_argument('--interval', type=float, help='keep draining the queue every INTERVAL seconds')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--organization', help='only this organization (default: all of them)')
+    args = parser.parse_args()
+
+    organizations = [args.organization] if args.organization else router.organizations()
+    if args.all:
+        for slug in organizations:
+            conn = sqlite3.connect(router.shard_path(slug), timeout=30)
+            try:
+                queue_all(conn)
+            finally:
+                conn.close()
+
+    while True:
+        for slug in organizations:
+            conn = sqlite3.connect(router.shard_path(slug), timeout=30)
+            try:
+                count = refresh(conn, args.top_k)
+            finally:
+                conn.close()
+            print(f"✅ Refreshed recommendations for {count} students in '{slug}'")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
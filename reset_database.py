@@ -1,32 +1,52 @@
 #!/usr/bin/env python3
 """
 Database Reset Script for Learning Hub
-This script will delete the existing database and create a new one with simple passwords.
+This script will delete the existing databases (every organization's shard,
+the directory and the report snapshots) and create a new one with simple passwords.
 """
 
 import os
 import sqlite3
 
+from database import DATABASE, seed_sample_data
+from recommendations import refresh
+from shards import router
+from snapshot import SNAPSHOT_DATABASE
 
-def reset_database():
-    """Delete existing database and create a new one"""
 
-    # Remove existing database
-    if os.path.exists('learning_hub.db'):
-        os.remove('learning_hub.db')
-        print("✅ Existing database deleted")
+def database_files():
+    """Every database file the app has written, with its WAL and shared-memory files"""
+    paths = [DATABASE, SNAPSHOT_DATABASE, router.directory_path]
+    # Shards and their snapshots all live in the shards directory
+    if os.path.isdir(router.shards_dir):
+        paths += [os.path.join(router.shards_dir, name) for name in sorted(os.listdir(router.shards_dir))
+                  if name.endswith('.db')]
+    return [path + suffix for path in paths for suffix in ('', '-wal', '-shm', '-journal')]
+
+
+def reset_database():
+    """Delete existing databases and create a new one"""
 
-    # Create new database connection
-    conn = sqlite3.connect('learning_hub.db')
-    conn.row_factory = sqlite3.Row
+    # Remove existing databases
+    removed = [path for path in database_files() if os.path.exists(path)]
+    for path in removed:
+        os.remove(path)
+    if removed:
+        print(f"✅ Existing databases deleted ({len(removed)} files)")
 
     try:
-        # Read and execute schema
-        with open('schema.sql', 'r') as f:
-            schema_sql = f.read()
-            conn.executescript(schema_sql)
+        # Build the schema from migrations, then load the demo data
+        version = router.setup()
+        seed_sample_data(DATABASE)
+        # Point the demo emails back at the default organization
+        router.sync_directory()
+        conn = sqlite3.connect(DATABASE)
+        try:
+            refresh(conn)
+        finally:
+            conn.close()
 
-        print("✅ New database created with sample data")
+        print(f"✅ New database created with sample data (schema version {version})")
         print("\n🔑 Demo Accounts (password: password123):")
         print("   • Admin: admin@learninghub.edu")
         print("   • Student: john.doe@student.edu")
@@ -37,8 +57,6 @@ def reset_database():
 
     except Exception as e:
         print(f"❌ Error creating database: {e}")
-    finally:
-        conn.close()
 
 
 if __name__ == "__main__":
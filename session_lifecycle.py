@@ -0,0 +1,109 @@
+"""
+Tutoring session lifecycle.
+
+Every status change is a compare-and-set: the UPDATE only matches while the
+session is still in one of the states the transition starts from, so two
+racing requests cannot both succeed and a finished session cannot be
+reopened. A transition that matches nothing raises TransitionError saying
+why, except that joining or starting a session that is already in progress
+is a no-op: whichever participant arrives second simply enters it.
+
+    scheduled / rescheduled --join (student)--> in_progress
+    scheduled / rescheduled --start (tutor)---> in_progress
+    in_progress ------------ --end (tutor)-----> completed
+    scheduled / rescheduled --cancel (either)--> cancelled
+"""
+
+import activity
+from models import TutorStats, fetch_one
+
+# action: (states it may start from, resulting state, who may perform it)
+TRANSITIONS = {
+    'join': (('scheduled', 'rescheduled'), 'in_progress', 'student'),
+    'start': (('scheduled', 'rescheduled'), 'in_progress', 'tutor'),
+    'end': (('in_progress',), 'completed', 'tutor'),
+    'cancel': (('scheduled', 'rescheduled'), 'cancelled', 'participant'),
+}
+
+# Actions that succeed without change when the session is already in their target state
+IDEMPOTENT = {'join', 'start'}
+
+_PAST_TENSE = {'join': 'joined', 'start': 'started', 'end': 'ended', 'cancel': 'cancelled'}
+
+# Ratings offered on the end-of-session form, stored as 1-5
+RATINGS = {
+    'excellent': 5,
+    'good': 4,
+    'average': 3,
+    'needs_work': 2,
+    'struggling': 1,
+}
+
+_ACTOR_CLAUSES = {
+    'student': ('student_id = ?', 1),
+    'tutor': ('tutor_id = ?', 1),
+    'participant': ('(student_id = ? OR tutor_id = ?)', 2),
+}
+
+
+class TransitionError(Exception):
+    """Raised when a session cannot make the requested transition"""
+
+    def __init__(self, message, current_status=None):
+        super().__init__(message)
+        self.current_status = current_status
+
+
+def parse_rating(value):
+    """Form value ('good', '4' or '') -> 1-5 or None"""
+    if value in (None, ''):
+        return None
+    if value in RATINGS:
+        return RATINGS[value]
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        raise TransitionError(f"Unknown rating '{value}'") from None
+    if not 1 <= rating <= 5:
+        raise TransitionError('Rating must be between 1 and 5')
+    return rating
+
+
+def transition(conn, session_id, action, user_id, notes=None, rating=None):
+    """Apply a lifecycle action atomically and commit; returns the new status"""
+    from_states, to_state, actor = TRANSITIONS[action]
+    actor_clause, actor_params = _ACTOR_CLAUSES[actor]
+
+    assignments = ['status = ?', 'updated_at = CURRENT_TIMESTAMP']
+    params = [to_state]
+    if notes is not None:
+        assignments.append('notes = ?')
+        params.append(notes)
+    if rating is not None:
+        assignments.append('rating = ?')
+        params.append(rating)
+
+    placeholders = ', '.join('?' for _ in from_states)
+    cursor = conn.execute(f'''
+        UPDATE sessions SET {', '.join(assignments)}
+        WHERE id = ? AND {actor_clause} AND status IN ({placeholders})
+    ''', params + [session_id] + [user_id] * actor_params + list(from_states))
+
+    if cursor.rowcount == 1:
+        conn.commit()
+        activity.record('session_' + to_state, user_id, session_id, **({'rating': rating} if rating else {}))
+        return to_state
+
+    conn.rollback()
+    row = conn.execute(f'SELECT status FROM sessions WHERE id = ? AND {actor_clause}',
+                       [session_id] + [user_id] * actor_params).fetchone()
+    if row is None:
+        raise TransitionError('Session not found or access denied.')
+    if row[0] == to_state and action in IDEMPOTENT:
+        return to_state
+    raise TransitionError(f"This session is {row[0].replace('_', ' ')} and cannot be {_PAST_TENSE[action]}.", row[0])
+
+
+def tutor_stats(conn, tutor_id):
+    """The incrementally maintained rating and completion figures for a tutor"""
+    return fetch_one(conn, TutorStats, 'SELECT * FROM tutor_stats WHERE tutor_id = ?', (tutor_id,))
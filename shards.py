@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Per-organization storage for Learning Hub.
+
+Each organization keeps its users, courses, sessions and activity in its own
+SQLite file (a shard), so schools never queue behind each other's write
+lock and write throughput grows with the number of organizations. A small
+directory database records where each organization's shard lives and which
+organization every email belongs to: that is all login needs to know before
+it can open the right shard. The default organization is the original
+learning_hub.db, so a single-school install works unchanged.
+
+    python shards.py create <slug> "<name>"   # add an organization
+    python shards.py list
+    python shards.py sync [<slug>]            # rebuild its email directory
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+from database import BASE_DIR, DATABASE, MIGRATIONS_DIR, get_pool, migrate
+
+DEFAULT_ORGANIZATION = 'default'
+DIRECTORY_DATABASE = os.environ.get('LEARNING_HUB_DIRECTORY_DB', os.path.join(BASE_DIR, 'directory.db'))
+SHARDS_DIR = os.environ.get('LEARNING_HUB_SHARDS_DIR', os.path.join(BASE_DIR, 'shards'))
+DIRECTORY_MIGRATIONS_DIR = os.path.join(MIGRATIONS_DIR, 'directory')
+
+_SLUG = re.compile(r'^[a-z0-9][a-z0-9_-]{0,62}$')
+
+
+class ShardError(Exception):
+    """Raised for an unknown or invalid organization"""
+
+
+class StorageRouter:
+    """Maps organizations and emails to shard database files"""
+
+    def __init__(self, directory_path=DIRECTORY_DATABASE, shards_dir=SHARDS_DIR, default_path=DATABASE):
+        self.directory_path = directory_path
+        self.shards_dir = shards_dir
+        self.default_path = default_path
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def _directory(self):
+        return get_pool(self.directory_path).connect()
+
+    def setup(self):
+        """Migrate the directory and every shard; returns the default shard's schema version"""
+        migrate(self.directory_path, DIRECTORY_MIGRATIONS_DIR)
+        version = migrate(self.default_path)
+        # Accounts created before sharding are only in the default database
+        self.sync_directory(DEFAULT_ORGANIZATION, prune=False)
+        for slug in self.organizations():
+            if slug != DEFAULT_ORGANIZATION:
+                migrate(self.shard_path(slug))
+        return version
+
+    def organizations(self):
+        conn = self._directory()
+        try:
+            return [row[0] for row in conn.execute('SELECT slug FROM organizations ORDER BY slug')]
+        finally:
+            conn.close()
+
+    def shard_path(self, slug):
+        """Database file holding an organization's data"""
+        path = self._paths.get(slug)
+        if path is not None:
+            return path
+
+        conn = self._directory()
+        try:
+            row = conn.execute('SELECT db_file FROM organizations WHERE slug = ?', (slug,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise ShardError(f"Unknown organization '{slug}'")
+
+        path = self.default_path if row[0] is None else os.path.join(self.shards_dir, row[0])
+        with self._lock:
+            self._paths[slug] = path
+        return path
+
+    def create_organization(self, slug, name):
+        """Register an organization and build its shard; returns the shard path"""
+        if not _SLUG.match(slug or ''):
+            raise ShardError('Organization codes use lowercase letters, digits, - and _')
+        os.makedirs(self.shards_dir, exist_ok=True)
+
+        conn = self._directory()
+        try:
+            conn.execute('INSERT INTO organizations (slug, name, db_file) VALUES (?, ?, ?)', (slug, name, f'{slug}.db'))
+            conn.commit()
+        except sqlite3.IntegrityError:
+            raise ShardError(f"Organization '{slug}' already exists") from None
+        finally:
+            conn.close()
+
+        path = self.shard_path(slug)
+        migrate(path)
+        return path
+
+    def organization_for_email(self, email):
+        """The organization an email is registered with, or None"""
+        conn = self._directory()
+        try:
+            row = conn.execute('SELECT organization FROM user_directory WHERE email = ?', (email,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def claim_email(self, email, slug):
+        """Reserve an email for an organization; False if it is taken anywhere"""
+        conn = self._directory()
+        try:
+            conn.execute('INSERT INTO user_directory (email, organization) VALUES (?, ?)', (email, slug))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        finally:
+            conn.close()
+
+    def confirm_email(self, email, user_id):
+        """Record the shard user id once the claimed account exists"""
+        self._update_directory('UPDATE user_directory SET user_id = ? WHERE email = ?', (user_id, email))
+
+    def release_email(self, email):
+        """Give up a claim whose account could not be created"""
+        self._update_directory('DELETE FROM user_directory WHERE email = ?', (email,))
+
+    def _update_directory(self, sql, params):
+        conn = self._directory()
+        try:
+            conn.execute(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def sync_directory(self, slug=DEFAULT_ORGANIZATION, prune=True):
+        """Rebuild an organization's directory entries from its shard's users
+
+        Needed after a shard is restored or reset; emails already claimed by
+        another organization are left with that organization. With
+        prune=False existing entries are kept and only missing ones added.
+        """
+        conn = sqlite3.connect(self.directory_path, timeout=30)
+        try:
+            conn.execute('ATTACH DATABASE ? AS shard', (self.shard_path(slug),))
+            with conn:
+                if prune:
+                    conn.execute('DELETE FROM user_directory WHERE organization = ?', (slug,))
+                conn.execute('''
+                    INSERT OR IGNORE INTO user_directory (email, organization, user_id)
+                    SELECT email, ?, id FROM shard.users
+                ''', (slug,))
+            return conn.execute('SELECT COUNT(*) FROM user_directory WHERE organization = ?', (slug,)).fetchone()[0]
+        finally:
+            conn.close()
+
+
+router = StorageRouter()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    migrate(router.directory_path, DIRECTORY_MIGRATIONS_DIR)
+
+    if args[:1] == ['create'] and len(args) == 3:
+        try:
+            path = router.create_organization(args[1], args[2])
+        except ShardError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Organization '{args[1]}' created at {path}")
+    elif args[:1] == ['list']:
+        for slug in router.organizations():
+            print(f"{slug:20} {router.shard_path(slug)}")
+    elif args[:1] == ['sync'] and len(args) <= 2:
+        slug = args[1] if len(args) == 2 else DEFAULT_ORGANIZATION
+        print(f"✅ {router.sync_directory(slug)} emails registered for '{slug}'")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Read-only snapshot of the Learning Hub database for reports.
+
+Admin reports and exports read a copy of learning_hub.db taken with
+SQLite's online backup API instead of the live file, so long scans never
+hold locks or evict pages that interactive requests depend on. The copy
+is written to a temporary file and swapped into place with os.replace(),
+so readers always see one complete, consistent snapshot; it is never
+modified in place, which lets connections open it immutable.
+
+connect() refreshes the snapshot in the background once it is older than
+max_age, and in the foreground when it is missing or predates the latest
+migration. To keep every organization's snapshot fresh from a single
+process instead:
+
+    python snapshot.py --interval 300
+    python snapshot.py --organization acme
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from database import BASE_DIR, DATABASE, load_migrations
+from shards import DEFAULT_ORGANIZATION, router
+
+SNAPSHOT_DATABASE = os.environ.get('LEARNING_HUB_SNAPSHOT_DB', os.path.join(BASE_DIR, 'learning_hub_snapshot.db'))
+DEFAULT_MAX_AGE = 300
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+
+def refresh(source=None, target=None):
+    """Copy `source` into `target` atomically; returns the seconds it took"""
+    source = source or DATABASE
+    target = target or SNAPSHOT_DATABASE
+    started = time.time()
+
+    fd, scratch = tempfile.mkstemp(prefix='.snapshot-', suffix='.db', dir=os.path.dirname(os.path.abspath(target)))
+    os.close(fd)
+    try:
+        src = sqlite3.connect(source, timeout=30)
+        dst = sqlite3.connect(scratch)
+        try:
+            # One step: the copy runs inside a single read transaction, which
+            # under WAL does not block writers
+            src.backup(dst)
+            # A rollback journal lets the snapshot be opened without a -shm file
+            dst.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            dst.close()
+            src.close()
+        os.replace(scratch, target)
+    except Exception:
+        if os.path.exists(scratch):
+            os.remove(scratch)
+        raise
+    return time.time() - started
+
+
+def snapshot_path(db_path):
+    """Where the snapshot of another database file (e.g. a shard) is kept"""
+    return os.path.splitext(db_path)[0] + '_snapshot.db'
+
+
+def taken_at(target=None):
+    """When the current snapshot was written, or None if there is none"""
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(target or SNAPSHOT_DATABASE))
+    except OSError:
+        return None
+
+
+def _refresh_in_background(source, target):
+    with _refresh_lock:
+        if target in _refreshing:
+            return
+        _refreshing.add(target)
+
+    def run():
+        try:
+            refresh(source, target)
+        except Exception as e:
+            print(f"Error refreshing snapshot: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(target)
+
+    threading.Thread(target=run, name='snapshot-refresh', daemon=True).start()
+
+
+def _open(target):
+    conn = sqlite3.connect(f'file:{target}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+    conn.execute('PRAGMA query_only = ON')
+    return conn
+
+
+def connect(source=None, target=None, max_age=DEFAULT_MAX_AGE):
+    """Open a read-only connection to a snapshot of `source`
+
+    A missing snapshot, or one taken before the latest migration, is
+    refreshed before returning; a merely stale one is served as is while a
+    background thread replaces it.
+    """
+    source = source or DATABASE
+    target = target or SNAPSHOT_DATABASE
+
+    taken = taken_at(target)
+    if taken is None:
+        refresh(source, target)
+        return _open(target)
+
+    conn = _open(target)
+    migrations = load_migrations()
+    if migrations and conn.execute('PRAGMA user_version').fetchone()[0] != migrations[-1][0]:
+        conn.close()
+        refresh(source, target)
+        return _open(target)
+
+    if (datetime.now() - taken).total_seconds() > max_age:
+        _refresh_in_background(source, target)
+    return conn
+
+
+def organization_snapshot_path(slug, db_path):
+    """The default organization keeps SNAPSHOT_DATABASE; other shards get their own"""
+    return SNAPSHOT_DATABASE if slug == DEFAULT_ORGANIZATION else snapshot_path(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the read-only reporting snapshots')
+    parser.add_argument('--organization', help='only this organization (default: all of them)')
+    parser.add_argument('--interval', type=float, help='keep refreshing every INTERVAL seconds')
+    args = parser.parse_args()
+
+    while True:
+        for slug in [args.organization] if args.organization else router.organizations():
+            source = router.shard_path(slug)
+            target = organization_snapshot_path(slug, source)
+            elapsed = refresh(source, target)
+            print(f"✅ Snapshot of '{slug}' written to {target} in {elapsed:.2f}s")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import migrate  # noqa: E402
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """A connection to a fully migrated, empty database"""
+    path = str(tmp_path / 'test.db')
+    migrate(path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def users(conn):
+    """{username: id} for one student and two tutors"""
+    conn.executemany('INSERT INTO users (username, email, password, role) VALUES (?, ?, ?, ?)',
+                     [('student', 'student@example.edu', 'x', 'student'),
+                      ('tutor', 'tutor@example.edu', 'x', 'tutor'),
+                      ('other_tutor', 'other@example.edu', 'x', 'tutor')])
+    conn.commit()
+    return dict(conn.execute('SELECT username, id FROM users'))
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from activity import EventLog, consume, cursor_position
+from database import migrate
+
+
+def event_log(db_path):
+    # A long interval keeps the background writer out of the way
+    return EventLog(db_path, flush_interval=3600, max_batch=10 ** 6)
+
+
+def test_failed_flush_keeps_the_events(tmp_path):
+    db_path = str(tmp_path / 'events.db')
+    log = event_log(db_path)
+    log.record('login', 1)
+    log.record('progress_updated', 1, 7, progress=50)
+
+    # No activity_events table yet
+    with pytest.raises(sqlite3.OperationalError):
+        log.flush()
+
+    log.record('logout', 1)
+    migrate(db_path)
+    assert log.flush() == 3
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute('SELECT event_type, subject_id, data FROM activity_events ORDER BY id').fetchall()
+    finally:
+        conn.close()
+    assert rows == [('login', None, None), ('progress_updated', 7, '{"progress": 50}'), ('logout', None, None)]
+    assert log.flush() == 0
+
+
+def add_events(conn, *event_types):
+    conn.executemany('INSERT INTO activity_events (event_type, occurred_at) VALUES (?, CURRENT_TIMESTAMP)',
+                     [(event_type,) for event_type in event_types])
+    conn.commit()
+
+
+def test_consume_commits_the_cursor_with_the_handler_writes(conn):
+    conn.execute('CREATE TABLE tally (event_type TEXT)')
+    add_events(conn, 'login', 'logout')
+
+    def tally(conn, events):
+        conn.executemany('INSERT INTO tally VALUES (?)', [(event.event_type,) for event in events])
+
+    assert consume(conn, 'tally', tally) == 2
+    assert cursor_position(conn, 'tally') == 2
+    assert consume(conn, 'tally', tally) == 0
+    assert conn.execute('SELECT COUNT(*) FROM tally').fetchone()[0] == 2
+
+
+def test_consume_rolls_back_both_when_the_handler_fails(conn):
+    conn.execute('CREATE TABLE tally (event_type TEXT)')
+    conn.commit()
+    add_events(conn, 'login')
+
+    def failing(conn, events):
+        conn.execute("INSERT INTO tally VALUES ('partial')")
+        raise RuntimeError('rollup failed')
+
+    with pytest.raises(RuntimeError):
+        consume(conn, 'tally', failing)
+    assert cursor_position(conn, 'tally') == 0
+    assert conn.execute('SELECT COUNT(*) FROM tally').fetchone()[0] == 0
+
+    # The same events are delivered again
+    seen = []
+    consume(conn, 'tally', lambda conn, events: seen.extend(event.event_type for event in events))
+    assert seen == ['login']
@@ -0,0 +1,38 @@
+from datetime import date
+
+from archive import archive_sessions
+
+
+def add_session(conn, users, scheduled_date, status, rating=None):
+    conn.execute('''INSERT INTO sessions (student_id, tutor_id, scheduled_date, scheduled_time, status, rating)
+                    VALUES (?, ?, ?, '10:00', ?, ?)''',
+                 (users['student'], users['tutor'], scheduled_date, status, rating))
+
+
+def stats(conn, tutor_id):
+    return conn.execute('''SELECT completed_sessions, cancelled_sessions, rating_count, average_rating
+                           FROM tutor_stats WHERE tutor_id = ?''', (tutor_id,)).fetchone()
+
+
+def test_only_old_finished_sessions_are_archived(conn, users):
+    add_session(conn, users, '2020-01-06', 'completed', 5)
+    add_session(conn, users, '2020-01-07', 'cancelled')
+    add_session(conn, users, '2020-01-08', 'scheduled')
+    add_session(conn, users, '2030-01-06', 'completed', 3)
+    conn.commit()
+    before = stats(conn, users['tutor'])
+
+    assert archive_sessions(conn, date(2025, 1, 1), batch_size=1) == 2
+
+    assert conn.execute('SELECT scheduled_date FROM sessions ORDER BY scheduled_date').fetchall() == \
+           [('2020-01-08',), ('2030-01-06',)]
+    assert conn.execute('SELECT scheduled_date, status FROM sessions_history ORDER BY scheduled_date').fetchall() == \
+           [('2020-01-06', 'completed'), ('2020-01-07', 'cancelled')]
+    assert conn.execute('SELECT COUNT(*) FROM all_sessions').fetchone()[0] == 4
+    assert stats(conn, users['tutor']) == before
+
+
+def test_nothing_to_archive(conn, users):
+    add_session(conn, users, '2020-01-06', 'in_progress')
+    conn.commit()
+    assert archive_sessions(conn, date(2025, 1, 1)) == 0
@@ -0,0 +1,58 @@
+import gzip
+import json
+import os
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+import assets  # noqa: E402
+from assets import minify_js  # noqa: E402
+
+
+def test_template_literals_are_copied_verbatim():
+    literal = ('`<div class="modal">\n'
+               '    <h2>${title}</h2>\n'
+               '\n'
+               '    <ul>${items.map(item => `<li class="${item.done ? \'done\' : ""}">${item.name}</li>`)\n'
+               '          .join(\'\')}</ul>\n'
+               '    // not a comment\n'
+               '</div>`')
+    source = f'function render(title, items) {{\n    // build the modal\n    return {literal};\n}}\n'
+
+    minified = minify_js(source)
+    assert literal in minified
+    assert 'build the modal' not in minified
+
+
+def test_regex_is_not_mistaken_for_division():
+    source = ('var half = total / 2; // halve it\n'
+              'var clean = text.replace(/\\s+\\/\\/ */g, " "); /* tidy */\n')
+    assert minify_js(source) == 'var half = total / 2;\nvar clean = text.replace(/\\s+\\/\\/ */g, " ");'
+
+
+def test_build_writes_a_manifest_and_precompressed_files_that_are_served(tmp_path):
+    static_dir, dist_dir = tmp_path / 'static', tmp_path / 'static' / 'dist'
+    (static_dir / 'js').mkdir(parents=True)
+    (static_dir / 'js' / 'main.js').write_text('// greet\nfunction greet(name) {\n    return `Hi ${name}`;\n}\n')
+
+    manifest = assets.build(str(static_dir), str(dist_dir))
+    assert json.loads((dist_dir / 'manifest.json').read_text()) == manifest
+    hashed = manifest['js/main.js']
+    assert hashed.startswith('dist/js/main.') and hashed.endswith('.js')
+    built = (static_dir / hashed).read_bytes()
+    assert gzip.decompress((static_dir / (hashed + '.gz')).read_bytes()) == built
+
+    app = flask.Flask(__name__, static_folder=str(static_dir))
+    assets.init_app(app, str(dist_dir))
+    with app.test_request_context():
+        assert flask.url_for('static', filename='js/main.js') == '/static/' + hashed
+
+    response = app.test_client().get('/static/' + hashed, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Cache-Control'] == f'public, max-age={assets.ONE_YEAR}, immutable'
+    assert gzip.decompress(response.get_data()) == built
+    response.close()
+
+    assert app.test_client().get('/static/dist/js/missing.js').status_code == 404
@@ -0,0 +1,118 @@
+import pytest
+
+import availability
+from availability import AvailabilityError, merge_windows, parse_update, save_week
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    # Tutors in different test databases share ids
+    monkeypatch.setattr(availability, 'cache', availability.AvailabilityCache())
+
+
+def stored(conn, tutor_id):
+    return conn.execute('''
+        SELECT id, day_of_week, start_time, end_time, is_available FROM tutor_availability
+        WHERE tutor_id = ? ORDER BY day_of_week, start_time
+    ''', (tutor_id,)).fetchall()
+
+
+def test_merge_joins_overlapping_and_adjacent_windows():
+    assert merge_windows([(1, 540, 600, True), (1, 570, 660, True), (1, 660, 720, True)]) == [(1, 540, 720, True)]
+
+
+def test_merge_keeps_days_and_kinds_apart():
+    windows = [(2, 540, 600, True), (1, 540, 600, True), (1, 570, 630, False), (1, 700, 760, True)]
+    assert merge_windows(windows) == [(1, 540, 600, True), (1, 570, 630, False), (1, 700, 760, True),
+                                      (2, 540, 600, True)]
+
+
+def test_merge_swallows_contained_windows():
+    assert merge_windows([(3, 480, 1020, True), (3, 600, 660, True)]) == [(3, 480, 1020, True)]
+
+
+def test_parse_update_accepts_a_week_or_one_window():
+    windows, replace = parse_update({'windows': [{'day': 1, 'start_time': '09:00', 'end_time': '10:30'}]})
+    assert (windows, replace) == ([(1, 540, 630, True)], True)
+
+    windows, replace = parse_update({'day_of_week': 0, 'start_time': '23:00', 'end_time': '24:00',
+                                     'is_available': False})
+    assert (windows, replace) == ([(0, 1380, 1440, False)], False)
+
+
+@pytest.mark.parametrize('payload', [
+    [1],
+    'windows',
+    {'windows': 'x'},
+    {'windows': [1]},
+    {'windows': [], 'replace': 'yes'},
+    {'day': 7, 'start_time': '09:00', 'end_time': '10:00'},
+    {'day': 1, 'start_time': '10:00', 'end_time': '09:00'},
+    {'day': 1, 'start_time': '9am', 'end_time': '10:00'},
+])
+def test_parse_update_rejects_malformed_payloads(payload):
+    with pytest.raises(AvailabilityError):
+        parse_update(payload)
+
+
+def test_save_week_stores_merged_windows(conn, users):
+    tutor = users['tutor']
+    assert save_week(conn, tutor, [(1, 540, 600, True), (1, 600, 720, True)]) == (1, 0)
+    assert [row[1:] for row in stored(conn, tutor)] == [(1, '09:00', '12:00', 1)]
+
+
+def test_save_week_only_touches_changed_rows(conn, users):
+    tutor = users['tutor']
+    save_week(conn, tutor, [(1, 540, 720, True), (3, 540, 720, True)])
+    monday = stored(conn, tutor)[0]
+
+    assert save_week(conn, tutor, [(1, 540, 720, True), (4, 600, 660, True)]) == (1, 1)
+    rows = stored(conn, tutor)
+    assert rows[0] == monday
+    assert [row[1:4] for row in rows] == [(1, '09:00', '12:00'), (4, '10:00', '11:00')]
+
+    # Saving the same week again changes nothing
+    assert save_week(conn, tutor, [(1, 540, 720, True), (4, 600, 660, True)]) == (0, 0)
+    assert stored(conn, tutor) == rows
+
+
+def test_save_week_can_merge_into_the_stored_week(conn, users):
+    tutor = users['tutor']
+    save_week(conn, tutor, [(1, 540, 600, True)])
+    assert save_week(conn, tutor, [(1, 600, 660, True)], replace=False) == (1, 1)
+    assert [row[1:4] for row in stored(conn, tutor)] == [(1, '09:00', '11:00')]
+
+
+def test_save_week_removes_duplicate_rows(conn, users):
+    tutor = users['tutor']
+    conn.executemany('INSERT INTO tutor_availability (tutor_id, day_of_week, start_time, end_time) VALUES (?, ?, ?, ?)',
+                     [(tutor, 2, '09:00', '10:00')] * 2)
+    conn.commit()
+    assert save_week(conn, tutor, [(2, 540, 600, True)]) == (0, 1)
+    assert len(stored(conn, tutor)) == 1
+
+
+def test_save_week_leaves_other_tutors_alone(conn, users):
+    save_week(conn, users['other_tutor'], [(5, 540, 600, True)])
+    save_week(conn, users['tutor'], [])
+    assert len(stored(conn, users['other_tutor'])) == 1
+
+
+def test_cached_week_is_reloaded_when_the_version_moves(conn, users):
+    tutor = users['tutor']
+    save_week(conn, tutor, [(1, 540, 600, True)])
+    assert availability.get_week(conn, tutor) == ((1, 540, 600, True),)
+    version = availability.availability_version(conn, tutor)
+
+    save_week(conn, tutor, [(1, 540, 660, True)])
+    assert availability.availability_version(conn, tutor) > version
+    assert availability.get_week(conn, tutor) == ((1, 540, 660, True),)
+
+
+def test_is_available_respects_blocked_windows(conn, users):
+    tutor = users['tutor']
+    assert availability.is_available(conn, tutor, 1, '09:00')
+    save_week(conn, tutor, [(1, 540, 720, True), (1, 600, 630, False)])
+    assert availability.is_available(conn, tutor, 1, '09:00')
+    assert not availability.is_available(conn, tutor, 1, '09:30')
+    assert not availability.is_available(conn, tutor, 2, '09:00')
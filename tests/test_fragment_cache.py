@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip('flask')
+
+from fragment_cache import FragmentCache, load_data_version  # noqa: E402
+
+
+def test_fragments_are_served_until_the_version_moves():
+    cache = FragmentCache()
+    assert cache.get(1, (1, 0), 'courses') is None
+    cache.set(1, (1, 0), 'courses', '<ul></ul>')
+    assert cache.get(1, (1, 0), 'courses') == '<ul></ul>'
+
+    assert cache.get(1, (2, 0), 'courses') is None
+    assert cache.size == 0
+
+
+def test_fragment_rendered_for_an_old_version_is_not_stored():
+    cache = FragmentCache()
+    cache.get(1, (2, 0), 'courses')
+    cache.set(1, (1, 0), 'courses', '<ul>stale</ul>')
+    assert cache.get(1, (2, 0), 'courses') is None
+
+
+def test_least_recently_used_fragments_are_evicted():
+    cache = FragmentCache(max_bytes=10)
+    for user_id in (1, 2):
+        cache.get(user_id, (1, 0), 'x')
+        cache.set(user_id, (1, 0), 'x', '12345')
+    cache.get(1, (1, 0), 'x')
+    cache.get(3, (1, 0), 'x')
+    cache.set(3, (1, 0), 'x', '12345')
+
+    assert cache.size == 10
+    assert cache.get(1, (1, 0), 'x') == '12345'
+    assert cache.get(2, (1, 0), 'x') is None
+
+
+def test_progress_and_course_changes_bump_data_versions(conn, users):
+    student = users['student']
+    assert load_data_version(conn, student) == (0, 0)
+
+    conn.execute("INSERT INTO courses (title, description) VALUES ('Algebra', 'x')")
+    course_id = conn.execute('SELECT id FROM courses').fetchone()[0]
+    conn.execute('INSERT INTO progress (user_id, course_id, progress) VALUES (?, ?, 10)', (student, course_id))
+    conn.commit()
+    user_version, shared_version = load_data_version(conn, student)
+    assert user_version > 0 and shared_version > 0
+
+    conn.execute('UPDATE progress SET progress = 20 WHERE user_id = ?', (student,))
+    conn.commit()
+    assert load_data_version(conn, student)[0] > user_version
+
+
+def test_name_and_email_changes_bump_the_shared_version(conn, users):
+    for change in ("username = 'renamed'", "email = 'renamed@example.edu'"):
+        before = load_data_version(conn, users['student'])[1]
+        conn.execute(f'UPDATE users SET {change} WHERE id = ?', (users['student'],))
+        conn.commit()
+        assert load_data_version(conn, users['student'])[1] > before
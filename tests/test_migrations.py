@@ -0,0 +1,118 @@
+import hashlib
+import sqlite3
+
+import pytest
+
+from database import MigrationError, load_migrations, migrate
+
+
+def write_migrations(directory, files):
+    directory.mkdir()
+    for name, sql in files.items():
+        (directory / name).write_text(sql)
+    return str(directory)
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    return write_migrations(tmp_path / 'migrations', {
+        '0001_items.sql': 'CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);',
+        '0002_item_index.sql': '-- names are looked up\nCREATE INDEX idx_items_name ON items(name);',
+    })
+
+
+def applied(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        rows = conn.execute('SELECT version, name, checksum FROM schema_migrations ORDER BY version').fetchall()
+    finally:
+        conn.close()
+    return version, rows
+
+
+def test_checksums_chain_every_earlier_migration(migrations_dir):
+    (_, _, sql1, checksum1), (_, _, sql2, checksum2) = load_migrations(migrations_dir)
+    assert checksum1 == hashlib.sha256(sql1.encode('utf-8')).hexdigest()
+    assert checksum2 == hashlib.sha256((checksum1 + sql2).encode('utf-8')).hexdigest()
+
+
+def test_checksums_ignore_line_endings(tmp_path):
+    lf = write_migrations(tmp_path / 'lf', {'0001_items.sql': 'CREATE TABLE items (\n    id INTEGER\n);\n'})
+    crlf = tmp_path / 'crlf'
+    crlf.mkdir()
+    (crlf / '0001_items.sql').write_bytes(b'CREATE TABLE items (\r\n    id INTEGER\r\n);\r\n')
+    assert load_migrations(lf)[0][3] == load_migrations(str(crlf))[0][3]
+
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    directory = write_migrations(tmp_path / 'migrations', {'0001_a.sql': 'SELECT 1;', '0001_b.sql': 'SELECT 2;'})
+    with pytest.raises(MigrationError):
+        load_migrations(directory)
+
+
+def test_migrate_applies_all_and_records_them(tmp_path, migrations_dir):
+    db_path = str(tmp_path / 'app.db')
+    assert migrate(db_path, migrations_dir) == 2
+
+    version, rows = applied(db_path)
+    assert version == 2
+    assert [(v, name, checksum) for v, name, checksum in rows] == \
+           [(v, name, checksum) for v, name, _, checksum in load_migrations(migrations_dir)]
+
+
+def test_current_database_is_left_alone(tmp_path, migrations_dir):
+    db_path = str(tmp_path / 'app.db')
+    migrate(db_path, migrations_dir)
+    before = applied(db_path)
+    assert migrate(db_path, migrations_dir) == 2
+    assert applied(db_path) == before
+
+
+def test_only_pending_migrations_are_applied(tmp_path):
+    db_path = str(tmp_path / 'app.db')
+    first = {'0001_items.sql': 'CREATE TABLE items (id INTEGER PRIMARY KEY);'}
+    migrate(db_path, write_migrations(tmp_path / 'v1', first))
+
+    # Running 0001 again would fail: the table already exists
+    second = dict(first, **{'0002_tags.sql': 'CREATE TABLE tags (id INTEGER PRIMARY KEY);'})
+    assert migrate(db_path, write_migrations(tmp_path / 'v2', second)) == 2
+    assert applied(db_path)[0] == 2
+
+
+def test_changed_migration_is_detected(tmp_path, migrations_dir):
+    db_path = str(tmp_path / 'app.db')
+    migrate(db_path, migrations_dir)
+    changed = write_migrations(tmp_path / 'changed', {
+        '0001_items.sql': 'CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, extra TEXT);',
+        '0002_item_index.sql': '-- names are looked up\nCREATE INDEX idx_items_name ON items(name);',
+    })
+    with pytest.raises(MigrationError):
+        migrate(db_path, changed)
+
+
+def test_database_newer_than_code_is_refused(tmp_path, migrations_dir):
+    db_path = str(tmp_path / 'app.db')
+    migrate(db_path, migrations_dir)
+    older = write_migrations(tmp_path / 'older', {
+        '0001_items.sql': 'CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);',
+    })
+    with pytest.raises(MigrationError):
+        migrate(db_path, older)
+
+
+def test_failed_migration_rolls_back(tmp_path):
+    db_path = str(tmp_path / 'app.db')
+    directory = write_migrations(tmp_path / 'migrations', {
+        '0001_items.sql': 'CREATE TABLE items (id INTEGER PRIMARY KEY);',
+        '0002_broken.sql': 'CREATE TABLE tags (id INTEGER PRIMARY KEY);\nINSERT INTO missing VALUES (1);',
+    })
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(db_path, directory)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name IN ('items', 'tags')").fetchall() == []
+    finally:
+        conn.close()
@@ -0,0 +1,18 @@
+import sqlite3
+
+from models import User, fetch_all, fetch_one
+
+
+def test_columns_become_attributes():
+    conn = sqlite3.connect(':memory:')
+    user = fetch_one(conn, User, "SELECT 1 AS id, 'ada' AS username, 3 AS sessions")
+    assert (user.id, user.username, user.sessions) == (1, 'ada', 3)
+    assert user['sessions'] == 3
+
+
+def test_keywords_and_model_attributes_are_skipped():
+    conn = sqlite3.connect(':memory:')
+    [user] = fetch_all(conn, User, 'SELECT 1 AS id, 2 AS "class", 3 AS keys, 4 AS to_dict')
+    assert user.id == 1
+    assert user.keys() == ('id',)
+    assert user.to_dict() == {'id': 1}
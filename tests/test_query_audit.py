@@ -0,0 +1,6 @@
+import query_audit
+
+
+def test_no_new_query_plan_problems():
+    """Fails when a statement scans or sorts in a way the baseline has not accepted"""
+    assert query_audit.main(['--check']) == 0
@@ -0,0 +1,58 @@
+import recommendations
+
+
+def enroll(conn, student_id, *course_ids):
+    conn.executemany('INSERT INTO enrollments (student_id, course_id) VALUES (?, ?)',
+                     [(student_id, course_id) for course_id in course_ids])
+    conn.commit()
+
+
+def queued(conn):
+    return [row[0] for row in conn.execute('SELECT student_id FROM recommendation_queue ORDER BY student_id')]
+
+
+def test_co_enrolled_courses_are_recommended(conn, users):
+    conn.executemany('INSERT INTO courses (title, description) VALUES (?, ?)',
+                     [('Algebra', 'x'), ('Geometry', 'x'), ('Poetry', 'x')])
+    conn.execute("INSERT INTO users (username, email, password, role) "
+                 "VALUES ('peer', 'peer@example.edu', 'x', 'student')")
+    peer = conn.execute("SELECT id FROM users WHERE username = 'peer'").fetchone()[0]
+    enroll(conn, peer, 1, 2)
+    enroll(conn, users['student'], 1)
+    assert queued(conn) == sorted([peer, users['student']])
+
+    assert recommendations.refresh(conn) == 2
+    assert queued(conn) == []
+    assert [course.id for course in recommendations.recommended_courses(conn, users['student'])][:1] == [2]
+
+
+def test_refresh_if_queued_only_rescores_changed_students(conn, users):
+    conn.execute("INSERT INTO courses (title, description) VALUES ('Algebra', 'x')")
+    conn.commit()
+    assert not recommendations.refresh_if_queued(conn, users['student'])
+
+    enroll(conn, users['student'], 1)
+    assert recommendations.refresh_if_queued(conn, users['student'])
+    assert queued(conn) == []
+
+
+def test_enrolling_queues_the_course_peers(conn, users):
+    conn.execute("INSERT INTO courses (title, description) VALUES ('Algebra', 'x')")
+    conn.execute("INSERT INTO users (username, email, password, role) "
+                 "VALUES ('peer', 'peer@example.edu', 'x', 'student')")
+    peer = conn.execute("SELECT id FROM users WHERE username = 'peer'").fetchone()[0]
+    enroll(conn, peer, 1)
+    recommendations.refresh(conn)
+
+    enroll(conn, users['student'], 1)
+    assert queued(conn) == sorted([peer, users['student']])
+
+
+def test_refresher_drains_every_database(conn, users):
+    db_path = conn.execute('PRAGMA database_list').fetchone()[2]
+    conn.execute("INSERT INTO courses (title, description) VALUES ('Algebra', 'x')")
+    enroll(conn, users['student'], 1)
+
+    refresher = recommendations.Refresher(lambda: [db_path])
+    assert refresher.refresh_all() == 1
+    assert queued(conn) == []
@@ -0,0 +1,74 @@
+import pytest
+
+from session_lifecycle import TransitionError, parse_rating, transition, tutor_stats
+
+
+@pytest.fixture
+def session_id(conn, users):
+    cursor = conn.execute('''INSERT INTO sessions (student_id, tutor_id, scheduled_date, scheduled_time)
+                             VALUES (?, ?, '2030-01-07', '10:00')''', (users['student'], users['tutor']))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def status(conn, session_id):
+    return conn.execute('SELECT status FROM sessions WHERE id = ?', (session_id,)).fetchone()[0]
+
+
+def data_version(conn, user_id):
+    row = conn.execute('SELECT version FROM data_versions WHERE user_id = ?', (user_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def test_full_lifecycle_updates_tutor_stats(conn, users, session_id):
+    assert transition(conn, session_id, 'start', users['tutor']) == 'in_progress'
+    assert transition(conn, session_id, 'end', users['tutor'], notes='Fractions', rating=4) == 'completed'
+
+    stats = tutor_stats(conn, users['tutor'])
+    assert (stats.completed_sessions, stats.rating_count, stats.average_rating) == (1, 1, 4.0)
+
+
+def test_join_and_start_are_idempotent(conn, users, session_id):
+    assert transition(conn, session_id, 'join', users['student']) == 'in_progress'
+    assert transition(conn, session_id, 'start', users['tutor']) == 'in_progress'
+    assert transition(conn, session_id, 'join', users['student']) == 'in_progress'
+
+
+def test_finished_session_cannot_be_reopened(conn, users, session_id):
+    transition(conn, session_id, 'cancel', users['student'])
+    with pytest.raises(TransitionError) as error:
+        transition(conn, session_id, 'start', users['tutor'])
+    assert error.value.current_status == 'cancelled'
+    assert status(conn, session_id) == 'cancelled'
+
+
+def test_only_participants_can_transition(conn, users, session_id):
+    with pytest.raises(TransitionError):
+        transition(conn, session_id, 'start', users['other_tutor'])
+    with pytest.raises(TransitionError):
+        transition(conn, session_id, 'end', users['student'])
+    assert status(conn, session_id) == 'scheduled'
+
+
+def test_cancel_counts_against_the_tutor(conn, users, session_id):
+    transition(conn, session_id, 'cancel', users['tutor'])
+    stats = tutor_stats(conn, users['tutor'])
+    assert (stats.completed_sessions, stats.cancelled_sessions) == (0, 1)
+
+
+def test_transitions_bump_both_participants_data_versions(conn, users, session_id):
+    before = data_version(conn, users['student']), data_version(conn, users['tutor'])
+    transition(conn, session_id, 'join', users['student'])
+    assert data_version(conn, users['student']) > before[0]
+    assert data_version(conn, users['tutor']) > before[1]
+
+
+@pytest.mark.parametrize('value, expected', [('excellent', 5), ('3', 3), (1, 1), ('', None), (None, None)])
+def test_parse_rating(value, expected):
+    assert parse_rating(value) == expected
+
+
+@pytest.mark.parametrize('value', ['great', '0', 6])
+def test_parse_rating_rejects_unknown_values(value):
+    with pytest.raises(TransitionError):
+        parse_rating(value)
@@ -0,0 +1,57 @@
+import os
+import sqlite3
+
+import pytest
+
+from shards import DEFAULT_ORGANIZATION, ShardError, StorageRouter
+
+
+@pytest.fixture
+def router(tmp_path):
+    router = StorageRouter(str(tmp_path / 'directory.db'), str(tmp_path / 'shards'), str(tmp_path / 'default.db'))
+    router.setup()
+    return router
+
+
+def directory_entry(router, email):
+    conn = sqlite3.connect(router.directory_path)
+    try:
+        return conn.execute('SELECT organization, user_id FROM user_directory WHERE email = ?', (email,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_an_email_can_only_be_claimed_once(router):
+    router.create_organization('acme', 'Acme')
+    assert router.claim_email('ada@example.edu', 'acme')
+    assert not router.claim_email('ada@example.edu', DEFAULT_ORGANIZATION)
+    assert router.organization_for_email('ada@example.edu') == 'acme'
+
+
+def test_confirm_records_the_shard_user(router):
+    router.claim_email('ada@example.edu', DEFAULT_ORGANIZATION)
+    assert directory_entry(router, 'ada@example.edu') == (DEFAULT_ORGANIZATION, None)
+    router.confirm_email('ada@example.edu', 42)
+    assert directory_entry(router, 'ada@example.edu') == (DEFAULT_ORGANIZATION, 42)
+
+
+def test_released_email_can_be_claimed_again(router):
+    router.claim_email('ada@example.edu', DEFAULT_ORGANIZATION)
+    router.release_email('ada@example.edu')
+    assert router.organization_for_email('ada@example.edu') is None
+    assert router.claim_email('ada@example.edu', DEFAULT_ORGANIZATION)
+
+
+def test_shard_paths(router):
+    assert router.shard_path(DEFAULT_ORGANIZATION) == router.default_path
+    path = router.create_organization('acme', 'Acme')
+    assert path == os.path.join(router.shards_dir, 'acme.db')
+    assert router.shard_path('acme') == path
+    assert router.organizations() == ['acme', DEFAULT_ORGANIZATION]
+
+
+def test_unknown_organization_is_refused(router):
+    with pytest.raises(ShardError):
+        router.shard_path('nowhere')
+    with pytest.raises(ShardError):
+        router.create_organization('Not A Slug', 'Bad')
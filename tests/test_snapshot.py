@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+import snapshot
+from database import load_migrations
+
+
+@pytest.fixture
+def source(conn):
+    conn.execute("INSERT INTO courses (title, description) VALUES ('Algebra', 'x')")
+    conn.commit()
+    return conn.execute('PRAGMA database_list').fetchone()[2]
+
+
+def test_missing_snapshot_is_taken_before_connecting(tmp_path, source):
+    target = str(tmp_path / 'snapshot.db')
+    assert snapshot.taken_at(target) is None
+
+    reader = snapshot.connect(source, target)
+    try:
+        assert reader.execute('SELECT title FROM courses').fetchall() == [('Algebra',)]
+        assert snapshot.taken_at(target) is not None
+    finally:
+        reader.close()
+
+
+def test_snapshot_from_an_older_schema_is_refreshed(tmp_path, source):
+    target = str(tmp_path / 'snapshot.db')
+    snapshot.refresh(source, target)
+    stale = sqlite3.connect(target)
+    stale.execute('PRAGMA user_version = 1')
+    stale.commit()
+    stale.close()
+
+    reader = snapshot.connect(source, target)
+    try:
+        assert reader.execute('PRAGMA user_version').fetchone()[0] == load_migrations()[-1][0]
+    finally:
+        reader.close()
+
+
+def test_snapshot_connection_is_read_only(tmp_path, source):
+    reader = snapshot.connect(source, str(tmp_path / 'snapshot.db'))
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("INSERT INTO courses (title, description) VALUES ('Geometry', 'x')")
+    finally:
+        reader.close()
@@ -0,0 +1,29 @@
+"""
+Production entry point for Learning Hub.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module does all per-deployment work once, in the master
+process, before workers are forked: pending migrations are applied (never
+sample data), every template is compiled and the asset manifest and
+fragment cache are created. The connections used for that are closed
+again, so workers inherit no SQLite handles and open their own database
+connections after the fork.
+"""
+
+import database
+from app import app, init_db
+
+
+def warm_up():
+    """Apply pending migrations and compile every template"""
+    init_db()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    # SQLite connections must not cross fork(): close the master's own
+    # before any worker exists, so every worker opens fresh ones
+    database.reset_pools()
+
+
+warm_up()
+application = app